@@ -0,0 +1,80 @@
+"""Upcoming meeting agenda, as rendered by the agenda email and its preview."""
+from collections import defaultdict
+from issues.models import IssueStatus, Proposal, IssueAttachment
+from ocd.base_managers import AccessLevel, get_access_level
+
+
+class UpcomingAgendaSnapshot(object):
+    """Holds the issues of the upcoming meeting together with their open
+    proposals and current attachments.
+
+    Everything is fetched in bulk when the snapshot is built (three queries,
+    however many issues there are), and each viewer's agenda is then
+    filtered from it in Python, so a single snapshot can be rendered for
+    any number of recipients.
+
+    """
+
+    def __init__(self, community):
+        self.community = community
+
+        self.issues = list(community.issues.filter(
+            active=True, status__in=IssueStatus.IS_UPCOMING).select_related(
+            'confidential_reason').order_by('order_in_upcoming_meeting'))
+
+        ids = [issue.id for issue in self.issues]
+        by_id = dict((issue.id, issue) for issue in self.issues)
+        for issue in self.issues:
+            issue.community = community
+
+        self.proposals = defaultdict(list)
+        if ids:
+            proposals = Proposal.objects.open().filter(
+                issue__in=ids).select_related('confidential_reason')
+            for p in proposals:
+                p.issue = by_id[p.issue_id]
+                self.proposals[p.issue_id].append(p)
+
+        self.attachments = defaultdict(list)
+        if ids:
+            attachments = IssueAttachment.objects.filter(
+                issue__in=ids, agenda_item__isnull=True).order_by('id')
+            for att in attachments:
+                att.issue = by_id[att.issue_id]
+                self.attachments[att.issue_id].append(att)
+
+    def issue_container(self, level):
+        """Returns the agenda as seen in the given access level: a list of
+        dicts of issue, open proposals and attachments.
+
+        """
+        public = level == AccessLevel.PUBLIC
+        container = []
+        for issue in self.issues:
+            if public and issue.is_confidential:
+                continue
+            proposals = [p for p in self.proposals[issue.id]
+                         if not (public and p.is_confidential)]
+            container.append({'issue': issue,
+                              'proposals': proposals,
+                              'attachments': self.attachments[issue.id]})
+        return container
+
+    def can_straw_vote(self, level):
+        """Are there open proposals on the agenda, as seen in the given access
+        level, to vote on?
+
+        """
+        if not self.community.upcoming_meeting_is_published:
+            return False
+        public = level == AccessLevel.PUBLIC
+        return any(self.proposals[issue.id] for issue in self.issues
+                   if not (public and issue.is_confidential))
+
+    def get_context(self, viewer, memberships=None):
+        """Returns the template context of the agenda as seen by viewer."""
+        level = get_access_level(viewer, self.community, memberships)
+        return {
+            'can_straw_vote': self.can_straw_vote(level),
+            'issue_container': self.issue_container(level),
+        }
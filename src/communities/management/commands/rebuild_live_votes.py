@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.shortcuts import get_object_or_404
+
+from communities.models import Community
+from issues.models import Proposal, rebuild_live_votes
+
+
+class Command(BaseCommand):
+    args = "[community_id]"
+    help = "rebuild the live straw vote counters from the recorded votes"
+
+    def handle(self, *args, **options):
+        proposals = Proposal.objects.all()
+        if args:
+            community = get_object_or_404(Community, pk=int(args[0]))
+            proposals = proposals.filter(issue__community=community)
+        with transaction.commit_on_success():
+            rebuild_live_votes(proposals)
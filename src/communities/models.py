@@ -1,13 +1,16 @@
 import logging
 from django.conf import settings
-from django.db import models, transaction
+from django.db import connection, models, transaction
+from django.db.models import Count
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 from django.utils import timezone
 from django.utils.translation import ugettext, ugettext_lazy as _
-from issues.models import ProposalStatus, IssueStatus, VoteResult
+from issues.models import ProposalStatus, ProposalVoteValue, IssueStatus, \
+    VoteResult
 from meetings.models import MeetingParticipant, Meeting
 from ocd.base_models import HTMLField, UIDMixin
+from ocd.utilities import update_in_bulk, update_search_index
 from users.default_roles import DefaultGroups
 from users.models import OCUser, Membership
 import issues.models as issues_models
@@ -276,14 +279,29 @@ class Community(UIDMixin):
         if only_when_over and time_till_close.total_seconds() > 0:
             return
 
-        proposals_to_sum = issues_models.Proposal.objects.filter(
+        proposal_ids = list(issues_models.Proposal.objects.filter(
             # votes_pro=None,
             status=ProposalStatus.IN_DISCUSSION,
             issue__status=IssueStatus.IN_UPCOMING_MEETING,
-            issue__community_id=self.id)
-        member_count = self.get_members().count()
-        for prop in proposals_to_sum:
-            prop.do_votes_summation(member_count)
+            issue__community_id=self.id).values_list('id', flat=True))
+        if not proposal_ids:
+            return
+
+        # tally all proposals in one grouped query, then write the results
+        # back in one statement.
+        votes_pro = dict.fromkeys(proposal_ids, 0)
+        votes_con = dict.fromkeys(proposal_ids, 0)
+        tally = {ProposalVoteValue.PRO: votes_pro,
+                 ProposalVoteValue.CON: votes_con}
+        votes = issues_models.ProposalVote.objects.filter(
+            proposal__in=proposal_ids, value__in=tally.keys()).values_list(
+            'proposal_id', 'value').annotate(Count('id')).order_by()
+        for proposal_id, value, count in votes:
+            tally[value][proposal_id] = count
+
+        update_in_bulk(issues_models.Proposal,
+                       {'votes_pro': votes_pro, 'votes_con': votes_con},
+                       community_members=self.get_members().count())
 
     def _get_upcoming_proposals(self, user=None, community=None):
         proposals = []
@@ -307,20 +325,18 @@ class Community(UIDMixin):
         return False
 
     def _register_absents(self, meeting, meeting_participants):
-        board_members = [mm.user for mm in Membership.objects.board() \
-            .filter(community=self, user__is_active=True)]
-        absents = set(board_members) - set(meeting_participants)
+        participant_ids = set(u.id for u in meeting_participants)
+        board = Membership.objects.board().filter(
+            community=self, user__is_active=True).select_related('user')
+        absents = [mm for mm in board if mm.user_id not in participant_ids]
         ordinal_base = len(meeting_participants)
-        for i, a in enumerate(absents):
-            try:
-                mm = a.memberships.get(community=self)
-            except Membership.DoesNotExist:
-                mm = None
-            MeetingParticipant.objects.create(meeting=meeting, user=a,
-                                              display_name=a.display_name,
-                                              ordinal=ordinal_base + i,
-                                              is_absent=True,
-                                              default_group_name=mm.default_group_name if mm else None)
+        MeetingParticipant.objects.bulk_create([
+            MeetingParticipant(meeting=meeting, user=mm.user,
+                               display_name=mm.user.display_name,
+                               ordinal=ordinal_base + i,
+                               is_absent=True,
+                               default_group_name=mm.default_group_name)
+            for i, mm in enumerate(absents)])
 
     def close_meeting(self, m, user, community):
         """
@@ -329,6 +345,9 @@ class Community(UIDMixin):
 
         Optionally changes statuses for :model:`issues.Issue`s and
         :model:`issues.Proposal`s.
+
+        Everything is written with bulk queries, so the number of queries
+        does not depend on the size of the agenda.
         """
 
         with transaction.commit_on_success():
@@ -357,66 +376,102 @@ class Community(UIDMixin):
             self.voting_ends_at = None
             self.save()
 
-            for i, issue in enumerate(self.upcoming_issues(user=user, community=community)):
+            issues = list(self.upcoming_issues(user=user,
+                                               community=community) or [])
+            issue_ids = [issue.id for issue in issues]
+
+            if issues:
+                proposals = issues_models.Proposal.objects.filter(
+                    issue__in=issue_ids)
 
-                proposals = issue.proposals.filter(
+                proposals.filter(
                     active=True,
                     decided_at_meeting=None
                 ).exclude(
                     status=ProposalStatus.IN_DISCUSSION
-                )
-                for p in proposals:
-                    p.decided_at_meeting = m
-                    p.save()
-
-                for p in issue.proposals.all():
-                    if p.votes_pro is not None:
-                        try:
-                            VoteResult.objects.create(
-                                proposal=p,
-                                meeting=m,
-                                votes_pro=p.votes_pro,
-                                votes_con=p.votes_con,
-                                community_members=p.community_members)
-                        except:
-                            pass
-
-                for c in issue.comments.filter(meeting=None):
-                    c.meeting = m
-                    c.save()
-
-                ai = meetings_models.AgendaItem.objects.create(
-                    meeting=m, issue=issue, order=i,
-                    background=issue.abstract,
-                    closed=issue.completed)
-
-                issue.attachments.filter(active=True,
-                                         agenda_item__isnull=True) \
-                    .update(agenda_item=ai)
-                issue.is_published = True
-                issue.abstract = None
-
-                if issue.completed:
-                    issue.order_in_upcoming_meeting = None
-
-                issue.save()
-            meeting_participants = self.upcoming_meeting_participants.all()
-            for i, p in enumerate(meeting_participants):
-                try:
-                    mm = p.memberships.get(community=self)
-                except Membership.DoesNotExist:
-                    mm = None
-
-                MeetingParticipant.objects.create(meeting=m, ordinal=i,
-                                                  user=p,
-                                                  display_name=p.display_name,
-                                                  default_group_name=mm.default_group_name if mm else None)
+                ).update(decided_at_meeting=m)
+
+                # a proposal with incomplete counts (e.g. edited in the
+                # admin) is left without a result rather than failing the
+                # whole meeting.
+                vote_results = []
+                for p_id, pro, con, members in proposals.filter(
+                        votes_pro__isnull=False).values_list(
+                        'id', 'votes_pro', 'votes_con', 'community_members'):
+                    if con is None or members is None:
+                        logger.warning('Proposal #{0} has incomplete vote '
+                                       'counts, no vote result recorded.'
+                                       .format(p_id))
+                        continue
+                    vote_results.append(VoteResult(
+                        proposal_id=p_id, meeting=m, votes_pro=pro,
+                        votes_con=con, community_members=members))
+                VoteResult.objects.bulk_create(vote_results)
+
+                issues_models.IssueComment.objects.filter(
+                    issue__in=issue_ids, meeting=None).update(meeting=m)
+
+                # bulk_create() skips save(), so confidentiality is copied
+                # from the issue here.
+                meetings_models.AgendaItem.objects.bulk_create([
+                    meetings_models.AgendaItem(
+                        meeting=m, issue=issue, order=i,
+                        background=issue.abstract,
+                        closed=issue.completed,
+                        is_confidential=issue.is_confidential)
+                    for i, issue in enumerate(issues)])
+
+                self._attach_to_agenda_items(m)
+
+                issues_models.Issue.objects.filter(id__in=issue_ids).update(
+                    is_published=True, abstract=None)
+                issues_models.Issue.objects.filter(
+                    id__in=issue_ids, completed=True).update(
+                    order_in_upcoming_meeting=None)
+
+            meeting_participants = list(
+                self.upcoming_meeting_participants.all())
+            groups = dict(self.memberships.filter(
+                user__in=meeting_participants).values_list(
+                'user_id', 'default_group_name'))
+
+            MeetingParticipant.objects.bulk_create([
+                MeetingParticipant(meeting=m, ordinal=i, user=p,
+                                   display_name=p.display_name,
+                                   default_group_name=groups.get(p.id))
+                for i, p in enumerate(meeting_participants)])
 
             self._register_absents(m, meeting_participants)
             self.upcoming_meeting_participants = []
 
+        # update() and bulk_create() do not send post_save, so the search
+        # index is brought up to date here.
+        if issues:
+            update_search_index(issues_models.Issue.objects.filter(
+                id__in=issue_ids))
+            update_search_index(issues_models.Proposal.objects.filter(
+                issue__in=issue_ids, decided_at_meeting=m).select_related(
+                'decided_at_meeting', 'assigned_to_user'))
+
         return m
 
+    def _attach_to_agenda_items(self, meeting):
+        """Moves the current attachments of the meeting's issues to their
+        agenda items, in a single query.
+
+        """
+        attachments = issues_models.IssueAttachment._meta.db_table
+        agenda_items = meetings_models.AgendaItem._meta.db_table
+        sql = ('UPDATE {0} SET agenda_item_id = ('
+               'SELECT ai.id FROM {1} ai WHERE ai.meeting_id = %s '
+               'AND ai.issue_id = {0}.issue_id) '
+               'WHERE active = %s AND agenda_item_id IS NULL AND issue_id IN ('
+               'SELECT issue_id FROM {1} WHERE meeting_id = %s)').format(
+            attachments, agenda_items)
+        cursor = connection.cursor()
+        cursor.execute(sql, [meeting.id, True, meeting.id])
+        transaction.set_dirty()
+
     def draft_meeting(self):
         if self.upcoming_meeting_scheduled_at:
             held_at = self.upcoming_meeting_scheduled_at.date()
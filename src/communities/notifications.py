@@ -1,19 +1,28 @@
 """Services for sending notifications to community members."""
 import logging
 import datetime
+from collections import defaultdict
 from itertools import chain
 from django.conf import settings
 from django.core.mail import EmailMultiAlternatives
 from django.template.loader import render_to_string
 from django.utils import translation
 import django_rq
+from rq import get_current_job
+from communities.agenda import UpcomingAgendaSnapshot
 from communities.models import SendToOption
+from oc_util.email_util import send_messages_in_chunks
+from ocd.base_managers import get_access_level
 from users.default_roles import DefaultGroups
+from users.models import OCUser
 from issues.models import IssueStatus
 
 
 logger = logging.getLogger(__name__)
 
+# seconds to keep the progress of a fanned out send around.
+PROGRESS_TTL = 60 * 60 * 24
+
 
 def get_guests_emails(guests_text):
     guest_emails = []
@@ -55,28 +64,19 @@ def construct_mock_users(email_list, type):
     return users
 
 
-def _base_send_mail(community, notification_type, sender, send_to, data=None,
-                    base_url=None, with_guests=False, language=None):
-    """Sends mail to community members, and applies object access control.
-
-    The type of email being sent is detected from notification_type.
-
-    """
-
-    if language:
-        translation.activate(language)
-
-    # before anything, we want to build our recipient list as email
-    # will be personalized.
+def _get_recipients(community, notification_type, sender, send_to,
+                    with_guests=False):
+    """Returns the list of users and watchers a notification goes out to."""
 
     if send_to == SendToOption.ONLY_ME:
         r = [sender]
 
     elif send_to == SendToOption.ALL_MEMBERS:
-        r = [m.user for m in community.memberships.all()]
+        r = [m.user for m in community.memberships.select_related('user')]
 
     elif send_to == SendToOption.BOARD_ONLY:
-        r = [m.user for m in community.memberships.board()]
+        r = [m.user for m in
+             community.memberships.board().select_related('user')]
 
     elif send_to == SendToOption.ONLY_ATTENDEES:
         r = [user for user in community.upcoming_meeting_participants.all()]
@@ -108,6 +108,8 @@ def _base_send_mail(community, notification_type, sender, send_to, data=None,
 
         # Add pending invitees to the watcher_recipients list if applicable
         if community.email_invitees:
+            invitees = []
+
             # pending invites to board only
             if send_to == SendToOption.BOARD_ONLY:
                 invitees = [i for i in community.invitations.exclude(
@@ -117,12 +119,154 @@ def _base_send_mail(community, notification_type, sender, send_to, data=None,
             elif send_to == SendToOption.ALL_MEMBERS:
                 invitees = [i for i in community.invitations.all()]
 
-            w.extend(invitees)
+            # invitees have no membership yet, so they are given the same
+            # access as any other watcher.
+            w.extend(construct_mock_users([i.email for i in invitees],
+                                          'invitee'))
 
     watcher_recipients = set(w)
 
-    # Make a union of the two sets to create the actual recipient list
-    recipients = user_recipients | watcher_recipients
+    # Make a union of the two sets to create the actual recipient list.
+    return sorted(user_recipients | watcher_recipients, key=_recipient_order)
+
+
+def _recipient_order(recipient):
+    return recipient.email, getattr(recipient, 'id', None)
+
+
+def _recipient_refs(recipients):
+    """Returns recipients as a pair of a list of user ids and a list of
+    (email, type) watchers, which a job can be given instead of the
+    recipients themselves.
+
+    """
+    user_ids = [r.id for r in recipients if not getattr(r, '_is_mock', False)]
+    watchers = [(r.email, r.type) for r in recipients
+                if getattr(r, '_is_mock', False)]
+    return user_ids, watchers
+
+
+def _load_recipients(refs):
+    """Returns the recipients of a pair made by `_recipient_refs`."""
+    user_ids, watchers = refs
+    recipients = list(OCUser.objects.filter(id__in=user_ids))
+    for email, type in watchers:
+        recipients.extend(construct_mock_users([email], type))
+    return sorted(recipients, key=_recipient_order)
+
+
+def _build_context(notification_type, community, viewer, data, agenda=None):
+    """Builds the template context of a notification, as seen by `viewer`.
+
+    An `UpcomingAgendaSnapshot` can be passed in as agenda to share it
+    between several viewers.
+
+    """
+
+    # TODO: All this logic for populating the context is basically copied
+    # from the same code in the views. This is not ideal, but without
+    # doing a refactor over great parts of the system it seems reasonable.
+
+    if notification_type == 'protocol_draft':
+
+        meeting_time = community.upcoming_meeting_scheduled_at
+        if not meeting_time:
+            meeting_time = datetime.datetime.now()
+
+        draft_agenda_payload = []
+        issue_status = IssueStatus.IS_UPCOMING
+        issues = community.issues.object_access_control(
+                user=viewer, community=community).filter(
+                active=True, status__in=(issue_status)).order_by(
+                'order_in_upcoming_meeting')
+
+        for issue in issues:
+            proposals = issue.proposals.object_access_control(
+                user=viewer, community=community)
+            draft_agenda_payload.append({'issue': issue, 'proposals': proposals})
+
+        agenda_items = community.draft_agenda(draft_agenda_payload)
+        item_attachments = [item['issue'].current_attachments() for
+                            item in agenda_items]
+
+        return {
+            'meeting_time': meeting_time.replace(second=0),
+            'agenda_items': agenda_items,
+            'attachments': list(chain.from_iterable(item_attachments))
+        }
+
+    elif notification_type == 'protocol':
+
+        agenda_items = data['meeting'].agenda.object_access_control(
+            user=viewer, community=community).all()
+
+        # restrict the proposals of each agenda item
+        for ai in agenda_items:
+            ai.accepted_proposals = ai.accepted_proposals(
+                user=viewer, community=community)
+            ai.rejected_proposals = ai.rejected_proposals(
+                user=viewer, community=community)
+            ai.proposals = ai.proposals(
+                user=viewer, community=community)
+
+        return {
+            'agenda_items': agenda_items,
+        }
+
+    elif notification_type == 'agenda':
+
+        agenda = agenda or UpcomingAgendaSnapshot(community)
+        return agenda.get_context(viewer)
+
+    return {}
+
+
+def _render_message(notification_type, context):
+    """Returns the subject, text body and html body of a notification."""
+    subject = render_to_string("emails/{0}_title.txt".format(
+        notification_type), context).strip()
+    body = render_to_string("emails/{0}.txt".format(notification_type),
+                            context)
+    as_html = render_to_string("emails/{0}.html".format(notification_type),
+                               context)
+    return subject, body, as_html
+
+
+def _base_send_mail(community, notification_type, sender, send_to, data=None,
+                    base_url=None, with_guests=False, language=None,
+                    recipients=None, progress_key=None):
+    """Sends mail to community members, and applies object access control.
+
+    The type of email being sent is detected from notification_type.
+
+    Recipients are grouped by the access level `object_access_control`
+    resolves them to, and each message is rendered once per group. Templates
+    are therefore shared by every recipient of a group and must not depend
+    on the individual recipient.
+
+    When recipients (as made by `_recipient_refs`) are given only they are
+    mailed, instead of the recipients of send_to; progress is then recorded
+    under progress_key (see `_fan_out_send_mail`).
+
+    """
+
+    if language:
+        translation.activate(language)
+
+    if recipients is None:
+        recipients = _get_recipients(community, notification_type, sender,
+                                     send_to, with_guests)
+    else:
+        recipients = _load_recipients(recipients)
+
+    # resolve all memberships at once instead of once per recipient.
+    memberships = dict(community.memberships.values_list(
+        'user_id', 'default_group_name'))
+
+    access_groups = defaultdict(list)
+    for recipient in recipients:
+        level = get_access_level(recipient, community, memberships)
+        access_groups[level].append(recipient)
 
     if not base_url:
         base_url = settings.HOST_URL
@@ -139,99 +283,114 @@ def _base_send_mail(community, notification_type, sender, send_to, data=None,
 
     from_email = "%s <%s>" % (community.name, settings.FROM_EMAIL)
 
-    for recipient in recipients:
-
-        # TODO: All this logic for populating the context is basically copied
-        # from the same code in the views. This is not ideal, but without
-        # doing a refactor over great parts of the system it seems reasonable.
-
-        if notification_type == 'protocol_draft':
-
-            meeting_time = community.upcoming_meeting_scheduled_at
-            if not meeting_time:
-                meeting_time = datetime.datetime.now()
-
-            draft_agenda_payload = []
-            issue_status = IssueStatus.IS_UPCOMING
-            issues = community.issues.object_access_control(
-                    user=recipient, community=community).filter(
-                    active=True, status__in=(issue_status)).order_by(
-                    'order_in_upcoming_meeting')
-
-            for issue in issues:
-                proposals = issue.proposals.object_access_control(
-                    user=recipient, community=community)
-                draft_agenda_payload.append({'issue': issue, 'proposals': proposals})
-
-            agenda_items = community.draft_agenda(draft_agenda_payload)
-            item_attachments = [item['issue'].current_attachments() for
-                                item in agenda_items]
-
-            d.update({
-                'recipient': recipient,
-                'meeting_time': meeting_time.replace(second=0),
-                'agenda_items': agenda_items,
-                'attachments': list(chain.from_iterable(item_attachments))
-            })
-
-        elif notification_type == 'protocol':
-
-            agenda_items = d['meeting'].agenda.object_access_control(
-                user=recipient, community=community).all()
-
-            # restrict the proposals of each agenda item
-            for ai in agenda_items:
-                ai.accepted_proposals = ai.accepted_proposals(
-                    user=recipient, community=community)
-                ai.rejected_proposals = ai.rejected_proposals(
-                    user=recipient, community=community)
-                ai.proposals = ai.proposals(
-                    user=recipient, community=community)
-
-            d.update({
-                'recipient': recipient,
-                'agenda_items': agenda_items,
-            })
-
-        elif notification_type == 'agenda':
-
-            can_straw_vote = community.upcoming_proposals_any(
-                 {'is_open': True}, user=recipient, community=community)\
-            and community.upcoming_meeting_is_published
-            upcoming_issues = community.upcoming_issues(user=recipient,
-                                                        community=community)
-            issues = []
-
-            for i in upcoming_issues:
-                proposals = i.proposals.object_access_control(
-                    user=recipient, community=community)
-                issues.append({'issue': i, 'proposals': proposals})
-
-            d.update({
-                'recipient': recipient,
-                'can_straw_vote': can_straw_vote,
-                'issue_container': issues
-            })
-
-        msg = {}
-        msg['subject'] = render_to_string("emails/{0}_title.txt".format(
-            notification_type), d).strip()
-        msg['body'] = render_to_string("emails/{0}.txt".format(notification_type), d)
-        as_html = render_to_string("emails/{0}.html".format(
-            notification_type), d)
-        msg['from_email'] = from_email
-        msg['to'] = [recipient.email]
-        msg = dict((k, v) for k, v in msg.iteritems() if v)
-        message = EmailMultiAlternatives(**msg)
-        message.attach_alternative(as_html, 'text/html')
-        message.send()
+    agenda = None
+    if notification_type == 'agenda' and recipients:
+        agenda = UpcomingAgendaSnapshot(community)
+
+    messages = []
+    for level, group in access_groups.items():
+
+        # every recipient in the group sees the very same objects, so the
+        # first one can stand in for the rest.
+        context = d.copy()
+        context.update(_build_context(notification_type, community, group[0],
+                                      d, agenda))
+        subject, body, as_html = _render_message(notification_type, context)
+
+        for recipient in group:
+            msg = {}
+            msg['subject'] = subject
+            msg['body'] = body
+            msg['from_email'] = from_email
+            msg['to'] = [recipient.email]
+            msg = dict((k, v) for k, v in msg.iteritems() if v)
+            message = EmailMultiAlternatives(**msg)
+            message.attach_alternative(as_html, 'text/html')
+            messages.append(message)
+
+    sent, failed = send_messages_in_chunks(messages)
+    if failed:
+        logger.error('Failed sending {0} mail to {1} of {2} recipients of '
+                     'community #{3}.'.format(notification_type, len(failed),
+                                              len(messages), community.id))
+
+    if progress_key:
+        _record_shard_progress(progress_key, sent, failed)
 
     return len(recipients)
 
 
+def get_shard_count(total, shard_size=None):
+    """Returns the number of jobs a send to `total` recipients is split to."""
+    shard_size = shard_size or settings.OPENCOMMUNITY_NOTIFICATION_SHARD_SIZE
+    return max(1, (total + shard_size - 1) // shard_size)
+
+
+def _progress_key(job_id):
+    return 'opencommunity:send_mail:{0}'.format(job_id)
+
+
+def _record_shard_progress(key, sent, failed):
+    pipe = django_rq.get_connection(settings.QUEUE_NAME).pipeline()
+    pipe.hincrby(key, 'shards_done', 1)
+    pipe.hincrby(key, 'sent', sent)
+    pipe.hincrby(key, 'failed', len(failed))
+    pipe.execute()
+
+
+def get_send_mail_progress(job_id):
+    """Returns the progress of a fanned out send as a dict of counts:
+    recipients, shards, shards_done, sent and failed.
+
+    """
+    progress = django_rq.get_connection(settings.QUEUE_NAME).hgetall(
+        _progress_key(job_id))
+    return dict((k, int(v)) for k, v in progress.iteritems())
+
+
+def _fan_out_send_mail(community, notification_type, sender, send_to,
+                       *args, **kwargs):
+    """Parent job of an async send: splits the recipients into shards and
+    enqueues a `_base_send_mail` job per shard, so several workers can
+    deliver a large send in parallel.
+
+    The recipients are computed here once, and every shard job is given its
+    own share of them, so that changes to the community while the shards
+    wait in the queue do not mail anyone twice, or not at all.
+
+    """
+    with_guests = kwargs.get('with_guests', False)
+    recipients = _get_recipients(community, notification_type, sender,
+                                 send_to, with_guests)
+    total = len(recipients)
+    shard_count = get_shard_count(total)
+
+    job = get_current_job()
+    key = _progress_key(job.id)
+    conn = django_rq.get_connection(settings.QUEUE_NAME)
+    conn.hmset(key, {'recipients': total, 'shards': shard_count,
+                     'shards_done': 0, 'sent': 0, 'failed': 0})
+    conn.expire(key, PROGRESS_TTL)
+
+    job.meta['progress_key'] = key
+    job.meta['shards'] = shard_count
+    job.save()
+
+    queue = django_rq.get_queue(settings.QUEUE_NAME)
+    for i in range(shard_count):
+        queue.enqueue(_base_send_mail, community, notification_type, sender,
+                      send_to, *args,
+                      recipients=_recipient_refs(recipients[i::shard_count]),
+                      progress_key=key,
+                      description=u"Send mail ({0}/{1})".format(
+                          i + 1, shard_count), **kwargs)
+
+    return total
+
+
 def _async_send_mail(*args, **kwargs):
     django_rq.get_queue(settings.QUEUE_NAME).enqueue(
-        _base_send_mail, *args, description=u"Send mail",
+        _fan_out_send_mail, *args, description=u"Send mail",
         language=settings.LANGUAGE_CODE, **kwargs)
     return True
 
@@ -1,10 +1,13 @@
 from communities.models import Community
+from django.db import connection
 from django.test.testcases import TestCase
 
 from communities.tests.common import create_sample_community
 from django.utils import timezone
-from issues.models import IssueStatus
+from issues.models import IssueStatus, IssueAttachment, Proposal, \
+    ProposalStatus, VoteResult
 from meetings.models import Meeting
+from users.models import OCUser
 
 
 class CreateMeetingTest(TestCase):
@@ -12,6 +15,52 @@ class CreateMeetingTest(TestCase):
         (self.c, self.members, self.chair) = create_sample_community()
         assert isinstance(self.c, Community)
 
+    def create_agenda(self, size):
+        issues = []
+        for i in xrange(size):
+            issue = self.c.issues.create(
+                created_by=self.chair[0], title="Issue %d" % i,
+                abstract="Abstract %d" % i,
+                status=IssueStatus.IN_UPCOMING_MEETING,
+                order_in_upcoming_meeting=i + 1,
+            )
+            for j in xrange(3):
+                issue.comments.create(created_by=self.chair[0],
+                                      content="Comment %d" % j)
+            Proposal.objects.create(issue=issue, created_by=self.chair[0],
+                                    type=Proposal.types.ADMIN,
+                                    title="Proposal %d" % i,
+                                    status=ProposalStatus.ACCEPTED,
+                                    votes_pro=2, votes_con=1,
+                                    community_members=18)
+            IssueAttachment.objects.create(issue=issue, title="File %d" % i,
+                                           file="file%d.txt" % i,
+                                           created_by=self.chair[0])
+            issues.append(issue)
+        return issues
+
+    def add_participants(self):
+        for u in self.members[-3:] + self.chair[:1]:
+            self.c.upcoming_meeting_participants.add(u)
+
+    def close_meeting(self, user=None):
+        m = Meeting(held_at=timezone.now())
+        self.c.close_meeting(m, user or self.chair[0], self.c)
+        return m
+
+    def count_close_meeting_queries(self):
+        # a fresh instance, so no run reuses the access levels cached on
+        # the user by a previous one
+        user = OCUser.objects.get(pk=self.chair[0].pk)
+        old = connection.use_debug_cursor
+        connection.use_debug_cursor = True
+        try:
+            start = len(connection.queries)
+            self.close_meeting(user)
+            return len(connection.queries) - start
+        finally:
+            connection.use_debug_cursor = old
+
     def test_create_meeting(self):
         self.issues = [
             self.c.issues.create(
@@ -22,7 +71,8 @@ class CreateMeetingTest(TestCase):
             ) for i in xrange(20)
         ]
 
-        self.assertEquals(20, self.c.upcoming_issues().count())
+        self.assertEquals(20, self.c.upcoming_issues(
+            user=self.chair[0], community=self.c).count())
 
         self.c.upcoming_meeting_participants.add(self.members[-1])
         self.c.upcoming_meeting_participants.add(self.members[-2])
@@ -35,3 +85,50 @@ class CreateMeetingTest(TestCase):
         self.assertEquals(20, m.agenda_items.count())
         self.assertEquals(4, m.participations.filter(is_absent=False).count())
         self.assertEquals(7, m.participations.filter(is_absent=True).count())
+
+    def test_close_meeting_records_agenda(self):
+        issues = self.create_agenda(3)
+        self.add_participants()
+
+        m = self.close_meeting()
+
+        agenda = list(m.agenda.all())
+        self.assertEquals([i.id for i in issues], [ai.issue_id for ai in agenda])
+        for ai in agenda:
+            self.assertEquals("Abstract %d" % ai.order, ai.background)
+            self.assertEquals(1, ai.attachments.count())
+            self.assertEquals(3, ai.comments().count())
+            self.assertEquals(1, ai.proposals(
+                user=self.chair[0], community=self.c).count())
+            self.assertTrue(ai.issue.is_published)
+            self.assertIsNone(ai.issue.abstract)
+        self.assertEquals(3, VoteResult.objects.filter(meeting=m).count())
+        self.assertEquals(
+            set(['chairman', 'member']),
+            set(m.participations.filter(is_absent=False).values_list(
+                'default_group_name', flat=True)))
+
+    def test_close_meeting_skips_incomplete_vote_counts(self):
+        issues = self.create_agenda(3)
+        broken = issues[1].proposals.get()
+        Proposal.objects.filter(id=broken.id).update(community_members=None)
+
+        m = self.close_meeting()
+
+        self.assertEquals(3, m.agenda_items.count())
+        self.assertEquals(
+            set(p.id for i in issues for p in i.proposals.all()) -
+            set([broken.id]),
+            set(VoteResult.objects.filter(meeting=m).values_list(
+                'proposal_id', flat=True)))
+
+    def test_close_meeting_query_count_is_constant(self):
+        self.create_agenda(2)
+        self.add_participants()
+        small = self.count_close_meeting_queries()
+
+        self.create_agenda(10)
+        self.add_participants()
+        large = self.count_close_meeting_queries()
+
+        self.assertEquals(small, large)
@@ -0,0 +1,281 @@
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.mail.message import EmailMessage
+from django.test import TestCase
+from django.test.utils import override_settings
+
+from communities import notifications
+from communities.agenda import UpcomingAgendaSnapshot
+from communities.models import SendToOption
+from communities.notifications import _base_send_mail, _get_recipients, \
+    _recipient_refs, get_shard_count, get_send_mail_progress
+from communities.tests.common import create_sample_community
+from issues.models import Issue, IssueStatus, Proposal
+from oc_util.email_util import send_messages_in_chunks
+from ocd.base_managers import AccessLevel
+from users.default_roles import DefaultGroups
+from users.models import Membership, OCUser
+
+
+class AgendaNotificationTest(TestCase):
+    def setUp(self):
+        (self.c, self.members, self.chairmen) = create_sample_community()
+        self.reason = self.c.confidential_reasons.all()[0]
+        self.public = Issue.objects.create(
+            community=self.c, created_by=self.chairmen[0],
+            title="Public issue", status=IssueStatus.IN_UPCOMING_MEETING)
+        self.secret = Issue.objects.create(
+            community=self.c, created_by=self.chairmen[0],
+            title="Secret issue", status=IssueStatus.IN_UPCOMING_MEETING,
+            confidential_reason=self.reason)
+
+    def tearDown(self):
+        mail.outbox = []
+
+    def test_agenda_rendered_per_access_level(self):
+        total = _base_send_mail(self.c, 'agenda', self.chairmen[0],
+                                SendToOption.ALL_MEMBERS)
+
+        self.assertEquals(18, total)
+        self.assertEquals(18, len(mail.outbox))
+
+        board_emails = set(m.user.email for m in self.c.memberships.board())
+        for message in mail.outbox:
+            html = message.alternatives[0][0]
+            self.assertEquals(1, len(message.to))
+            self.assertIn(self.public.title, html)
+            if message.to[0] in board_emails:
+                self.assertIn(self.secret.title, html)
+            else:
+                self.assertNotIn(self.secret.title, html)
+
+        # one rendering per access level, shared by the whole group
+        self.assertEquals(2, len(set(m.alternatives[0][0]
+                                     for m in mail.outbox)))
+
+    def test_single_member(self):
+        member = self.c.memberships.get(
+            default_group_name=DefaultGroups.MEMBER, user=self.members[-1])
+        total = _base_send_mail(self.c, 'agenda', member.user,
+                                SendToOption.ONLY_ME)
+
+        self.assertEquals(1, total)
+        self.assertEquals([member.user.email], mail.outbox[0].to)
+        self.assertNotIn(self.secret.title, mail.outbox[0].alternatives[0][0])
+
+    def test_given_recipients_only(self):
+        recipients = _get_recipients(self.c, 'agenda', self.chairmen[0],
+                                     SendToOption.ALL_MEMBERS)
+        total = _base_send_mail(self.c, 'agenda', self.chairmen[0],
+                                SendToOption.ALL_MEMBERS,
+                                recipients=_recipient_refs(recipients[:5]))
+
+        self.assertEquals(5, total)
+        self.assertEquals(sorted(r.email for r in recipients[:5]),
+                          sorted(m.to[0] for m in mail.outbox))
+
+    def test_shard_count(self):
+        self.assertEquals(1, get_shard_count(0, 500))
+        self.assertEquals(1, get_shard_count(500, 500))
+        self.assertEquals(2, get_shard_count(501, 500))
+        self.assertEquals(20, get_shard_count(10000, 500))
+
+
+class FakeRedis(object):
+    """The few redis commands the send mail jobs use."""
+
+    def __init__(self):
+        self.data = {}
+
+    def hmset(self, key, mapping):
+        self.data.setdefault(key, {}).update(
+            (k, str(v)) for k, v in mapping.iteritems())
+
+    def hincrby(self, key, field, amount=1):
+        h = self.data.setdefault(key, {})
+        h[field] = str(int(h.get(field, 0)) + amount)
+
+    def hgetall(self, key):
+        return dict(self.data.get(key, {}))
+
+    def expire(self, key, seconds):
+        pass
+
+    def pipeline(self):
+        return self
+
+    def execute(self):
+        pass
+
+
+class FakeQueue(object):
+    def __init__(self):
+        self.jobs = []
+
+    def enqueue(self, func, *args, **kwargs):
+        kwargs.pop('description', None)
+        self.jobs.append((func, args, kwargs))
+
+
+class FakeDjangoRQ(object):
+    def __init__(self):
+        self.connection = FakeRedis()
+        self.queue = FakeQueue()
+
+    def get_connection(self, name):
+        return self.connection
+
+    def get_queue(self, name):
+        return self.queue
+
+
+class FakeJob(object):
+    id = 'job'
+
+    def __init__(self):
+        self.meta = {}
+
+    def save(self):
+        pass
+
+
+@override_settings(OPENCOMMUNITY_NOTIFICATION_SHARD_SIZE=5)
+class FanOutSendMailTest(TestCase):
+    def setUp(self):
+        (self.c, self.members, self.chairmen) = create_sample_community()
+        self.old_django_rq = notifications.django_rq
+        self.old_get_current_job = notifications.get_current_job
+        self.rq = notifications.django_rq = FakeDjangoRQ()
+        self.job = FakeJob()
+        notifications.get_current_job = lambda: self.job
+
+    def tearDown(self):
+        notifications.django_rq = self.old_django_rq
+        notifications.get_current_job = self.old_get_current_job
+        mail.outbox = []
+
+    def fan_out(self):
+        return notifications._fan_out_send_mail(
+            self.c, 'agenda', self.chairmen[0], SendToOption.ALL_MEMBERS)
+
+    def run_shards(self):
+        for func, args, kwargs in self.rq.queue.jobs:
+            func(*args, **kwargs)
+
+    def test_shards(self):
+        expected = [r.email for r in _get_recipients(
+            self.c, 'agenda', self.chairmen[0], SendToOption.ALL_MEMBERS)]
+
+        self.assertEquals(18, self.fan_out())
+
+        self.assertEquals(4, len(self.rq.queue.jobs))
+        self.assertEquals(4, self.job.meta['shards'])
+        self.assertEquals({'recipients': 18, 'shards': 4, 'shards_done': 0,
+                           'sent': 0, 'failed': 0},
+                          get_send_mail_progress(self.job.id))
+
+        self.run_shards()
+
+        self.assertEquals(sorted(expected),
+                          sorted(m.to[0] for m in mail.outbox))
+        self.assertEquals({'recipients': 18, 'shards': 4, 'shards_done': 4,
+                           'sent': 18, 'failed': 0},
+                          get_send_mail_progress(self.job.id))
+
+    def test_shards_ignore_later_changes(self):
+        expected = [r.email for r in _get_recipients(
+            self.c, 'agenda', self.chairmen[0], SendToOption.ALL_MEMBERS)]
+        self.fan_out()
+
+        # a member joins, and another one leaves, before the shards run
+        u = OCUser.objects.create_user("late@example.com", "Late")
+        Membership.objects.create(user=u, community=self.c,
+                                  default_group_name=DefaultGroups.MEMBER)
+        self.c.memberships.filter(user=self.members[0]).delete()
+        self.run_shards()
+
+        self.assertEquals(sorted(expected),
+                          sorted(m.to[0] for m in mail.outbox))
+
+
+class UpcomingAgendaSnapshotTest(TestCase):
+    def setUp(self):
+        (self.c, self.members, self.chairmen) = create_sample_community()
+        self.reason = self.c.confidential_reasons.all()[0]
+        for i in range(5):
+            issue = Issue.objects.create(
+                community=self.c, created_by=self.chairmen[0],
+                title="Issue %d" % i, order_in_upcoming_meeting=i,
+                status=IssueStatus.IN_UPCOMING_MEETING)
+            for j in range(3):
+                Proposal.objects.create(
+                    issue=issue, created_by=self.chairmen[0],
+                    type=Proposal.types.ADMIN, title="Proposal %d.%d" % (i, j),
+                    confidential_reason=self.reason if j == 2 else None)
+
+    def test_fixed_number_of_queries(self):
+        with self.assertNumQueries(3):
+            agenda = UpcomingAgendaSnapshot(self.c)
+            container = agenda.issue_container(AccessLevel.CONFIDENTIAL)
+            for obj in container:
+                for p in obj['proposals']:
+                    p.get_absolute_url()
+
+        self.assertEquals(["Issue %d" % i for i in range(5)],
+                          [obj['issue'].title for obj in container])
+        self.assertEquals([3] * 5, [len(obj['proposals'])
+                                    for obj in container])
+
+    def test_public_level_hides_confidential_proposals(self):
+        agenda = UpcomingAgendaSnapshot(self.c)
+        container = agenda.issue_container(AccessLevel.PUBLIC)
+
+        self.assertEquals([2] * 5, [len(obj['proposals'])
+                                    for obj in container])
+        self.assertFalse(any(p.is_confidential for obj in container
+                             for p in obj['proposals']))
+
+
+class FlakyBackend(EmailBackend):
+    """Refuses to deliver to bad addresses and counts its sessions."""
+
+    def __init__(self, *args, **kwargs):
+        super(FlakyBackend, self).__init__(*args, **kwargs)
+        self.sessions = 0
+        self.is_open = False
+
+    def open(self):
+        if not self.is_open:
+            self.is_open = True
+            self.sessions += 1
+
+    def close(self):
+        self.is_open = False
+
+    def send_messages(self, messages):
+        for message in messages:
+            if message.to[0].startswith('bad'):
+                raise IOError("Connection lost")
+        return super(FlakyBackend, self).send_messages(messages)
+
+
+class ChunkedSendTest(TestCase):
+    def tearDown(self):
+        mail.outbox = []
+
+    def test_failures_do_not_abort_batch(self):
+        emails = ['user%d@example.com' % i for i in range(7)]
+        emails.insert(3, 'bad@example.com')
+        messages = [EmailMessage('subject', 'body', 'from@example.com', [e])
+                    for e in emails]
+        connection = FlakyBackend()
+
+        sent, failed = send_messages_in_chunks(messages, chunk_size=3,
+                                               retries=1,
+                                               connection=connection)
+
+        self.assertEquals(7, sent)
+        self.assertEquals(['bad@example.com'], failed)
+        self.assertEquals(7, len(mail.outbox))
+        # one session per chunk, plus a reconnect after each failed attempt
+        self.assertEquals(5, connection.sessions)
@@ -0,0 +1,60 @@
+import datetime
+from django.test import TestCase
+from django.utils import timezone
+
+from communities.tests.common import create_sample_community
+from issues.models import Issue, IssueStatus, Proposal, ProposalStatus, \
+    ProposalVote, ProposalVoteValue
+
+
+class SumVoteResultsTest(TestCase):
+    def setUp(self):
+        (self.c, self.members, self.chairmen) = create_sample_community()
+        self.c.voting_ends_at = timezone.now() - datetime.timedelta(hours=1)
+        self.c.save()
+        issue = Issue.objects.create(
+            community=self.c, created_by=self.chairmen[0], title="Issue",
+            status=IssueStatus.IN_UPCOMING_MEETING)
+        self.proposals = [
+            Proposal.objects.create(issue=issue, created_by=self.chairmen[0],
+                                    type=Proposal.types.ADMIN,
+                                    title="Proposal %d" % i)
+            for i in range(3)]
+
+    def vote(self, proposal, values):
+        for user, value in zip(self.members, values):
+            ProposalVote.objects.create(proposal=proposal, user=user,
+                                        value=value)
+
+    def test_sum_vote_results(self):
+        pro, con, neutral = (ProposalVoteValue.PRO, ProposalVoteValue.CON,
+                             ProposalVoteValue.NEUTRAL)
+        self.vote(self.proposals[0], [pro, pro, con, neutral])
+        self.vote(self.proposals[1], [con, con, con])
+        decided = Proposal.objects.create(
+            issue=self.proposals[0].issue, created_by=self.chairmen[0],
+            type=Proposal.types.ADMIN, title="Decided",
+            status=ProposalStatus.ACCEPTED)
+        self.vote(decided, [pro])
+
+        with self.assertNumQueries(4):
+            self.c.sum_vote_results()
+
+        results = [Proposal.objects.values_list(
+            'votes_pro', 'votes_con', 'community_members').get(id=p.id)
+            for p in self.proposals + [decided]]
+        self.assertEquals([(2, 1, 18), (0, 3, 18), (0, 0, 18),
+                           (None, None, None)], results)
+
+    def test_not_summed_while_voting(self):
+        self.c.voting_ends_at = timezone.now() + datetime.timedelta(hours=1)
+        self.c.save()
+        self.vote(self.proposals[0], [ProposalVoteValue.PRO])
+
+        self.c.sum_vote_results()
+        self.assertIsNone(Proposal.objects.get(
+            id=self.proposals[0].id).votes_pro)
+
+        self.c.sum_vote_results(only_when_over=False)
+        self.assertEquals(1, Proposal.objects.get(
+            id=self.proposals[0].id).votes_pro)
@@ -18,6 +18,7 @@ from django.views.generic.detail import DetailView, SingleObjectMixin
 from django.views.generic.edit import UpdateView, DeleteView
 
 from communities import models
+from communities.agenda import UpcomingAgendaSnapshot
 from communities.forms import EditUpcomingMeetingForm,\
     PublishUpcomingMeetingForm, UpcomingMeetingParticipantsForm,\
     EditUpcomingMeetingSummaryForm
@@ -152,16 +153,8 @@ class PublishUpcomingMeetingPreviewView(CommunityModelMixin, DetailView):
 
     def get_context_data(self, **kwargs):
         d = super(PublishUpcomingMeetingPreviewView, self).get_context_data(**kwargs)
-        d['can_straw_vote'] = self.community.upcoming_proposals_any(
-            {'is_open': True}, user=self.request.user, community=self.community)\
-        and self.community.upcoming_meeting_is_published
-        upcoming_issues = self.community.upcoming_issues(
-            user=self.request.user, community=self.community)
-        d['issue_container'] = []
-        for i in upcoming_issues:
-            proposals = i.proposals.object_access_control(
-                user=self.request.user, community=self.community)
-            d['issue_container'] .append({'issue': i, 'proposals': proposals})
+        agenda = UpcomingAgendaSnapshot(self.community)
+        d.update(agenda.get_context(self.request.user))
         return d
 
 
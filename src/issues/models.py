@@ -1,3 +1,4 @@
+from collections import defaultdict
 from django.conf import settings
 from django.db import models, transaction
 from django.db.models.signals import post_save
@@ -9,6 +10,7 @@ from django.utils.translation import ugettext, ugettext_lazy as _
 from ocd.base_models import HTMLField, UIDMixin, UIDManager, ConfidentialMixin
 from ocd.base_managers import ConfidentialQuerySetMixin, ActiveQuerySetMixin
 from ocd.storages import uploads_storage
+from ocd.utilities import update_in_bulk
 from ocd.validation import enhance_html
 from taggit.managers import TaggableManager
 import meetings
@@ -463,6 +465,9 @@ class Proposal(UIDMixin, ConfidentialMixin):
                                             blank=True)
     community_members = models.PositiveIntegerField(_("Community members"),
                                                     null=True, blank=True)
+    # running straw vote tally, see update_live_votes()
+    live_votes_pro = models.PositiveIntegerField(default=0, editable=False)
+    live_votes_con = models.PositiveIntegerField(default=0, editable=False)
     tags = TaggableManager(_("Tags"), blank=True)
     register_board_votes = models.BooleanField(default=False)
 
@@ -535,49 +540,13 @@ class Proposal(UIDMixin, ConfidentialMixin):
 
     @property
     def board_vote_result(self):
-        total_votes = 0
-        votes_dict = {'sums': {}, 'total': total_votes, 'per_user': {}}
-        pro_count = 0
-        con_count = 0
-        neut_count = 0
-
         users = self.issue.community.upcoming_meeting_participants.all()
-        for u in users:
-            vote = ProposalVoteBoard.objects.filter(proposal=self, user=u)
-            if vote.exists():
-                votes_dict['per_user'][u] = vote[0].value
-                if vote[0].value == 1:
-                    pro_count += 1
-                    total_votes += 1
-                elif vote[0].value == -1:
-                    con_count += 1
-                    total_votes += 1
-                elif vote[0].value == 0:
-                    neut_count += 1
-
-            else:
-                votes_dict['per_user'][u] = 0
-                neut_count += 1
-
-        votes_dict['sums']['pro_count'] = pro_count
-        votes_dict['sums']['con_count'] = con_count
-        votes_dict['sums']['neut_count'] = neut_count
-        votes_dict['total'] = total_votes
+        votes_dict = board_vote_results([self], users)[self.id]
+        votes_dict['per_user'] = dict(
+            (u, vote.value if vote else 0)
+            for u, vote in votes_dict['per_user'].items())
         return votes_dict
 
-
-    def do_votes_summation(self, members_count):
-
-        pro_votes = ProposalVote.objects.filter(proposal=self,
-                                                value=ProposalVoteValue.PRO).count()
-        con_votes = ProposalVote.objects.filter(proposal=self,
-                                                value=ProposalVoteValue.CON).count()
-        self.votes_pro = pro_votes
-        self.votes_con = con_votes
-        self.community_members = members_count
-        self.save()
-
-
     def is_task(self):
         return self.type == ProposalType.TASK
 
@@ -625,6 +594,96 @@ class Proposal(UIDMixin, ConfidentialMixin):
             self.is_confidential = True
 
 
+def summarize_board_votes(users, votes):
+    """Returns the board vote result of a proposal: the pro, con and neutral
+    sums, the total of non neutral votes and the vote of each user (None
+    where the user has not voted).
+
+    votes maps user ids to their `ProposalVoteBoard`.
+
+    """
+    pro_count = 0
+    con_count = 0
+    neut_count = 0
+    per_user = {}
+    for u in users:
+        vote = votes.get(u.id)
+        per_user[u] = vote
+        if vote is None or vote.value == ProposalVoteValue.NEUTRAL:
+            neut_count += 1
+        elif vote.value == ProposalVoteValue.PRO:
+            pro_count += 1
+        elif vote.value == ProposalVoteValue.CON:
+            con_count += 1
+
+    return {
+        'sums': {
+            'pro_count': pro_count,
+            'con_count': con_count,
+            'neut_count': neut_count,
+        },
+        'total': pro_count + con_count,
+        'per_user': per_user,
+    }
+
+
+def board_vote_results(proposals, users):
+    """Returns the board vote results of many proposals, keyed by proposal
+    id, fetching the votes of all of them in a single query.
+
+    """
+    users = list(users)
+    votes = defaultdict(dict)
+    if users:
+        for vote in ProposalVoteBoard.objects.filter(
+                proposal__in=[p.id for p in proposals],
+                user__in=[u.id for u in users]):
+            votes[vote.proposal_id][vote.user_id] = vote
+    return dict((p.id, summarize_board_votes(users, votes[p.id]))
+                for p in proposals)
+
+
+LIVE_VOTE_FIELDS = {
+    ProposalVoteValue.PRO: 'live_votes_pro',
+    ProposalVoteValue.CON: 'live_votes_con',
+}
+
+
+def update_live_votes(proposal_id, old_value, new_value):
+    """Moves one straw vote between the live counters of a proposal.
+
+    old_value is None for a new vote and new_value is None for a removed
+    one. The counters are updated in the database with F() expressions, so
+    concurrent votes do not overwrite each other.
+
+    """
+    old_field = LIVE_VOTE_FIELDS.get(old_value)
+    new_field = LIVE_VOTE_FIELDS.get(new_value)
+    if old_field == new_field:
+        return
+    changes = {}
+    if old_field:
+        changes[old_field] = models.F(old_field) - 1
+    if new_field:
+        changes[new_field] = models.F(new_field) + 1
+    Proposal.objects.filter(id=proposal_id).update(**changes)
+
+
+def rebuild_live_votes(proposals):
+    """Recounts the live straw vote counters of proposals from the votes."""
+    ids = list(proposals.values_list('id', flat=True))
+    if not ids:
+        return
+    counters = dict((field, dict.fromkeys(ids, 0))
+                    for field in LIVE_VOTE_FIELDS.values())
+    votes = ProposalVote.objects.filter(
+        proposal__in=ids, value__in=LIVE_VOTE_FIELDS.keys()).values_list(
+        'proposal_id', 'value').annotate(models.Count('id')).order_by()
+    for proposal_id, value, count in votes:
+        counters[LIVE_VOTE_FIELDS[value]][proposal_id] = count
+    update_in_bulk(Proposal, counters)
+
+
 class VoteResult(models.Model):
     """ straw vote result per proposal, per meeting """
     proposal = models.ForeignKey(Proposal, related_name="results")
@@ -646,15 +705,13 @@ class IssueRankingVote(models.Model):
     issue = models.ForeignKey(Issue, related_name='ranking_votes')
     rank = models.PositiveIntegerField()
 
+    class Meta:
+        unique_together = (("voted_by", "issue"),)
+
     @property
     def is_confidential(self):
         return self.issue.is_confidential
 
-    # TODO: add unique_together = (
-    #   ('voted_by', 'issue'),
-    #   and maybe: ('voted_by', 'rank')
-    # )
-
 
 @receiver(post_save, sender=Issue)
 def set_confidential_on_relations(sender, instance, created,
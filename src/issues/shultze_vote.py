@@ -1,43 +1,112 @@
+from django.conf import settings
+from django.db.models import Count
 from django.http.response import HttpResponse, HttpResponseBadRequest
 from django.shortcuts import get_object_or_404, render, redirect
 from shultze.models import IssuesGraph
 from issues.models import Issue, IssueRankingVote
 from ocd.base_views import json_response
+from ocd.utilities import update_in_bulk
+from datetime import timedelta
+import django_rq
 import json
 
+# A lost ranking job must not block the community's ranking for long.
+RANKING_PENDING_TTL = 10 * 60
+
 
 def user_vote(community_id, current_vote, prev_vote=[]):
+    """Replaces a user's previous ballot with the current one in the
+    community's issues graph, and returns the graph."""
     try:
         g = IssuesGraph.objects.get(community_id=community_id)
     except IssuesGraph.DoesNotExist:
         g = IssuesGraph.objects.create(community_id=community_id)
         g.initialize_graph()
-    if prev_vote:
-        g.add_ballots(prev_vote,reverse=True)
-    g.add_ballots(current_vote)
+    g.replace_ballots(prev_vote or [], current_vote)
+    return g
 
 
-def set_issues_order_by_votes(community_id):
-    Issue.objects.filter(community_id=community_id).update(\
-        order_by_votes=9999)
-    try:
-        g = IssuesGraph.objects.get(community_id=community_id)
-    except IssuesGraph.DoesNotExist:
-        raise
+def set_issues_order_by_votes(community_id, g=None):
+    """Ranks the community's issues by votes.
+
+    Pass the graph user_vote() returned to rank by its already loaded
+    matrix. Only the issues whose order_by_votes changed are written, in a
+    single update.
 
-    order = g.get_schulze_npr_order_and_rating_bottom_up_sum()
+    """
+    if g is None:
+        g = IssuesGraph.objects.get(community_id=community_id)
+        order = g.get_schulze_npr_order_and_rating_bottom_up_sum()
+    else:
+        order = g.get_schulze_npr_order_and_rating_bottom_up_sum(reload=False)
     min_obj = order[0].keys()[0]
     max_obj = order[-1].keys()[0]
-    min_likes = IssueRankingVote.objects.filter(issue__id=min_obj, rank__gt=1).count()
-    max_likes = IssueRankingVote.objects.filter(issue__id=max_obj, rank__gt=1).count()
+    likes = dict(IssueRankingVote.objects.filter(
+        issue__id__in=[min_obj, max_obj], rank__gt=1)
+        .values_list('issue').annotate(Count('id')))
+    min_likes = likes.get(min_obj, 0)
+    max_likes = likes.get(max_obj, 0)
     normorder = g.normalize_ordered_rating_bottom_up_sum(order, min_likes, max_likes)
 
-    issues = Issue.objects.in_bulk([i.keys()[0] for i in normorder])
+    current = dict(Issue.objects.filter(community_id=community_id)
+                   .values_list('id', 'order_by_votes'))
+    new = dict.fromkeys(current, 9999)
     for id_entry in normorder:
         id = id_entry.keys()[0]
-        issues[id].order_by_votes = id_entry[id]
-#        print issues[id].title, id_entry[id]
-        issues[id].save()
+        if id in new:
+            new[id] = id_entry[id]
+    changed = dict((id, value) for id, value in new.items()
+                   if current[id] != value)
+    update_in_bulk(Issue, {'order_by_votes': changed})
+
+
+def _ranking_pending_key(community_id):
+    return 'opencommunity:issue_ranking:pending:{0}'.format(community_id)
+
+
+def _ranked_recently_key(community_id):
+    return 'opencommunity:issue_ranking:ranked:{0}'.format(community_id)
+
+
+def _rank_issues(community_id):
+    """Background job re-ranking the community's issues.
+
+    Clears the pending flag before ranking: votes cast until the ranking
+    starts are coalesced into it, later ones schedule the next run.
+
+    """
+    conn = django_rq.get_connection(settings.QUEUE_NAME)
+    interval = settings.OPENCOMMUNITY_ISSUE_RANKING_INTERVAL
+    conn.set(_ranked_recently_key(community_id), 1, px=int(interval * 1000))
+    conn.delete(_ranking_pending_key(community_id))
+    set_issues_order_by_votes(community_id)
+
+
+def schedule_issues_ranking(community_id, g=None):
+    """Re-ranks the community's issues after a vote.
+
+    With OPENCOMMUNITY_ASYNC_ISSUE_RANKING, a ranking job is enqueued unless
+    one is already pending for the community. If the issues were ranked
+    less than OPENCOMMUNITY_ISSUE_RANKING_INTERVAL seconds ago, the job is
+    handed to the scheduler to be enqueued once the interval has passed,
+    so that no worker waits for it. Otherwise the issues are ranked right
+    away, by g's matrix if given (see set_issues_order_by_votes).
+
+    """
+    if not settings.OPENCOMMUNITY_ASYNC_ISSUE_RANKING:
+        set_issues_order_by_votes(community_id, g)
+        return
+    conn = django_rq.get_connection(settings.QUEUE_NAME)
+    if not conn.set(_ranking_pending_key(community_id), 1, nx=True,
+                    ex=RANKING_PENDING_TTL):
+        return
+    wait = conn.pttl(_ranked_recently_key(community_id))
+    if wait > 0:
+        django_rq.get_scheduler(settings.QUEUE_NAME).enqueue_in(
+            timedelta(milliseconds=wait), _rank_issues, community_id)
+    else:
+        django_rq.get_queue(settings.QUEUE_NAME).enqueue(
+            _rank_issues, community_id, description=u"Rank issues")
 
 
 def send_issue_ranking(request):
@@ -50,33 +119,32 @@ def send_issue_ranking(request):
                             .order_by('rank')
 
         if current_vote:
-            prev_param = {'ballot': [], 'count': 1, }
-            current_param = {'ballot': [], 'count': 1, }
-            if prev_vote:
-                prev_vote_as_list = list(prev_vote.values_list('issue_id', flat=True))
-                for v in prev_vote:
-                    v.delete()
-
-                for v in prev_vote_as_list:
-                    prev_param['ballot'].append([v])
-                prev_param = [prev_param,]
+            # an issue ranked twice keeps its first rank
+            seen = set()
+            current_vote = [v for v in current_vote
+                            if not (v in seen or seen.add(v))]
+
+            prev_vote_as_list = list(prev_vote.values_list('issue_id', flat=True))
+            if prev_vote_as_list:
+                prev_param = [{'ballot': [[v] for v in prev_vote_as_list],
+                               'count': 1, }]
             else:
                 prev_param = None
+            current_param = {'ballot': [[v] for v in current_vote],
+                             'count': 1, }
 
-            for i, v in enumerate(current_vote):
-                IssueRankingVote.objects.create(
-                    voted_by=request.user,
-                    issue_id=v,
-                    rank=i
-                )
-                current_param['ballot'].append([v])
+            prev_vote.delete()
+            IssueRankingVote.objects.bulk_create([
+                IssueRankingVote(voted_by=request.user, issue_id=v, rank=i)
+                for i, v in enumerate(current_vote)
+            ])
             remaining_issues = Issue.objects.filter(community_id=cid, active=True) \
                                             .exclude(id__in=current_vote)
             # current_param['ballot'].append([issue.id for issue in remaining_issues])
             current_param = [current_param,]
             # print current_param, prev_param
-            user_vote(cid, current_param, prev_param)
-            set_issues_order_by_votes(request.POST['community_id'])
+            g = user_vote(cid, current_param, prev_param)
+            schedule_issues_ranking(cid, g)
             return HttpResponse(json_response('ok'))
 
 
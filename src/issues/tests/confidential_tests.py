@@ -4,6 +4,7 @@ from django.test import TestCase
 from communities.models import Community
 from users.models import DefaultGroups, Membership
 from meetings.models import Meeting
+from ocd.base_managers import AccessLevel, get_access_level
 from issues.models import (Issue, IssueComment, IssueCommentRevision,
                            IssueAttachment, Proposal, ProposalVote,
                            ProposalVoteBoard, VoteResult)
@@ -189,6 +190,36 @@ class ConfidentialLogicTestCase(TestCase):
         self.assertTrue(open_set['proposal_vote_board'].is_confidential)
 
 
+class AccessLevelTestCase(TestCase):
+
+    """Tests the resolution of a user's confidentiality tier."""
+
+    def setUp(self):
+        self.community = Community.objects.create(name="A Community")
+        self.member = User.objects.create(email='member@email.com')
+        Membership.objects.create(user=self.member, community=self.community,
+                                  default_group_name=DefaultGroups.MEMBER)
+        self.board = User.objects.create(email='board@email.com')
+        Membership.objects.create(user=self.board, community=self.community,
+                                  default_group_name=DefaultGroups.BOARD)
+
+    def test_access_level(self):
+        self.assertEqual(AccessLevel.PUBLIC,
+                         get_access_level(self.member, self.community))
+        self.assertEqual(AccessLevel.CONFIDENTIAL,
+                         get_access_level(self.board, self.community))
+
+    def test_access_level_resolved_once_per_user(self):
+        with self.assertNumQueries(1):
+            for i in range(3):
+                Issue.objects.object_access_control(
+                    user=self.member, community=self.community)
+                get_access_level(self.member, self.community)
+        with self.assertNumQueries(1):
+            Issue.objects.object_access_control(
+                user=self.board, community=self.community)
+
+
 class ConfidentialAccessTestCase(TestCase):
 
     """Tests access via request to objects with the `is_confidential` property."""
@@ -0,0 +1,158 @@
+from datetime import timedelta
+import json
+
+from django.core.urlresolvers import reverse
+from django.db import IntegrityError
+from django.test.client import Client
+from django.test.testcases import TestCase
+from django.test.utils import override_settings
+
+from communities.tests.common import create_sample_community
+from issues import shultze_vote
+from issues.models import Issue, IssueRankingVote
+
+
+class IssueRankingTestCase(TestCase):
+    def setUp(self):
+        (self.c, self.members, self.chairmen) = create_sample_community()
+        self.issues = [Issue.objects.create(community=self.c,
+                                            title="Issue %d" % i,
+                                            created_by=self.chairmen[0])
+                       for i in range(3)]
+        self.url = reverse('issues', args=(self.c.id,))
+
+    def rank(self, user, issues):
+        client = Client()
+        client.login(email=user.email, password='password')
+        response = client.post(self.url, {
+            'community_id': self.c.id,
+            'new_order': json.dumps([i.id for i in issues]),
+        })
+        self.assertEquals(200, response.status_code)
+
+    def ranked_by(self, user):
+        return list(IssueRankingVote.objects.filter(voted_by=user)
+                    .order_by('rank').values_list('issue_id', 'rank'))
+
+    def order(self):
+        return list(Issue.objects.filter(community=self.c).order_by(
+            '-order_by_votes').values_list('id', flat=True))
+
+
+@override_settings(OPENCOMMUNITY_ASYNC_ISSUE_RANKING=False)
+class IssueRankingTest(IssueRankingTestCase):
+
+    def test_ranking_without_queue(self):
+        a, b, c = self.issues
+        self.rank(self.members[-1], [c, a, b])
+        self.rank(self.members[-2], [c, a, b])
+        self.rank(self.members[-3], [a, b, c])
+        self.assertEquals([c.id, a.id, b.id], self.order())
+
+        self.rank(self.members[-1], [a, b, c])
+        self.assertEquals([a.id, b.id, c.id], self.order())
+        self.assertEquals([(a.id, 0), (b.id, 1), (c.id, 2)],
+                          self.ranked_by(self.members[-1]))
+
+    def test_issue_ranked_twice(self):
+        a, b, c = self.issues
+        self.rank(self.members[-1], [b, a, b, c])
+        self.assertEquals([(b.id, 0), (a.id, 1), (c.id, 2)],
+                          self.ranked_by(self.members[-1]))
+
+    def test_single_vote_per_issue(self):
+        IssueRankingVote.objects.create(voted_by=self.members[-1],
+                                        issue=self.issues[0], rank=0)
+        with self.assertRaises(IntegrityError):
+            IssueRankingVote.objects.create(voted_by=self.members[-1],
+                                            issue=self.issues[0], rank=1)
+
+
+class FakeRedis(object):
+    """The few redis commands the ranking jobs use, with expiries in
+    milliseconds left rather than running out."""
+
+    def __init__(self):
+        self.data = {}
+
+    def set(self, key, value, ex=None, px=None, nx=False):
+        if nx and key in self.data:
+            return None
+        self.data[key] = (value, px if px is not None else
+                          ex * 1000 if ex is not None else None)
+        return True
+
+    def pttl(self, key):
+        if key not in self.data:
+            return -2
+        ttl = self.data[key][1]
+        return -1 if ttl is None else ttl
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+
+class FakeQueue(object):
+    def __init__(self):
+        self.jobs = []
+
+    def enqueue(self, func, *args, **kwargs):
+        self.jobs.append((func, args))
+
+    def enqueue_in(self, time_delta, func, *args, **kwargs):
+        self.jobs.append((time_delta, func, args))
+
+
+class FakeDjangoRQ(object):
+    def __init__(self):
+        self.connection = FakeRedis()
+        self.queue = FakeQueue()
+        self.scheduler = FakeQueue()
+
+    def get_connection(self, name):
+        return self.connection
+
+    def get_queue(self, name):
+        return self.queue
+
+    def get_scheduler(self, name):
+        return self.scheduler
+
+
+@override_settings(OPENCOMMUNITY_ASYNC_ISSUE_RANKING=True,
+                   OPENCOMMUNITY_ISSUE_RANKING_INTERVAL=10)
+class AsyncIssueRankingTest(IssueRankingTestCase):
+    def setUp(self):
+        super(AsyncIssueRankingTest, self).setUp()
+        self.old_django_rq = shultze_vote.django_rq
+        self.rq = shultze_vote.django_rq = FakeDjangoRQ()
+        self.pending = shultze_vote._ranking_pending_key(self.c.id)
+
+    def tearDown(self):
+        shultze_vote.django_rq = self.old_django_rq
+
+    def test_votes_coalesced(self):
+        a, b, c = self.issues
+        self.rank(self.members[-1], [c, a, b])
+        self.rank(self.members[-2], [c, a, b])
+
+        self.assertEquals([(shultze_vote._rank_issues, (str(self.c.id),))],
+                          self.rq.queue.jobs)
+        self.assertEquals([], self.rq.scheduler.jobs)
+        self.assertIn(self.pending, self.rq.connection.data)
+
+    def test_job_clears_pending_key(self):
+        a, b, c = self.issues
+        self.rank(self.members[-1], [c, a, b])
+        func, args = self.rq.queue.jobs.pop()
+        func(*args)
+
+        self.assertNotIn(self.pending, self.rq.connection.data)
+        self.assertEquals(c.id, self.order()[0])
+
+        # ranked just now: the next run waits for the interval to pass,
+        # in the scheduler rather than in a worker
+        self.rank(self.members[-2], [a, b, c])
+        self.assertEquals([], self.rq.queue.jobs)
+        self.assertEquals([(timedelta(seconds=10), shultze_vote._rank_issues,
+                            (str(self.c.id),))], self.rq.scheduler.jobs)
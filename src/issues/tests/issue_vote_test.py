@@ -0,0 +1,125 @@
+from django.core.urlresolvers import reverse
+from django.template import Context, Template
+from django.test.client import Client
+from django.test.testcases import TestCase
+
+from communities.tests.common import create_sample_community
+from issues.models import Issue, Proposal, ProposalVote, ProposalVoteBoard, \
+    ProposalVoteValue, board_vote_results, rebuild_live_votes
+
+
+class LiveVotesTest(TestCase):
+    def setUp(self):
+        (self.c, self.members, self.chairmen) = create_sample_community()
+        issue = Issue.objects.create(community=self.c, title="Issue",
+                                     created_by=self.chairmen[0])
+        self.p = Proposal.objects.create(issue=issue, title="Proposal",
+                                         created_by=self.chairmen[0],
+                                         type=Proposal.types.ADMIN)
+        self.url = reverse('vote_on_proposal', args=(self.c.id, self.p.id))
+
+    def vote(self, user, val):
+        client = Client()
+        client.login(email=user.email, password='password')
+        response = client.post(self.url, {'val': val})
+        self.assertEquals(200, response.status_code)
+
+    def counters(self):
+        return Proposal.objects.values_list(
+            'live_votes_pro', 'live_votes_con').get(id=self.p.id)
+
+    def test_counters_follow_votes(self):
+        self.vote(self.members[-1], 'pro')
+        self.vote(self.members[-2], 'pro')
+        self.vote(self.members[-3], 'con')
+        self.assertEquals((2, 1), self.counters())
+
+        self.vote(self.members[-1], 'con')
+        self.assertEquals((1, 2), self.counters())
+
+        self.vote(self.members[-2], 'neut')
+        self.assertEquals((0, 2), self.counters())
+
+        self.vote(self.members[-3], 'reset')
+        self.assertEquals((0, 1), self.counters())
+
+    def test_rebuild_live_votes(self):
+        for user, value in zip(self.members, (ProposalVoteValue.PRO,
+                                              ProposalVoteValue.PRO,
+                                              ProposalVoteValue.CON,
+                                              ProposalVoteValue.NEUTRAL)):
+            ProposalVote.objects.create(proposal=self.p, user=user,
+                                        value=value)
+        Proposal.objects.filter(id=self.p.id).update(live_votes_pro=7)
+
+        rebuild_live_votes(Proposal.objects.all())
+
+        self.assertEquals((2, 1), self.counters())
+
+
+class BoardVoteResultsTest(TestCase):
+    def setUp(self):
+        (self.c, self.members, self.chairmen) = create_sample_community()
+        issue = Issue.objects.create(community=self.c, title="Issue",
+                                     created_by=self.chairmen[0])
+        self.proposals = [
+            Proposal.objects.create(issue=issue, title="Proposal %d" % i,
+                                    created_by=self.chairmen[0],
+                                    type=Proposal.types.ADMIN)
+            for i in range(3)]
+        self.board = self.members[:4]
+        for u in self.board:
+            self.c.upcoming_meeting_participants.add(u)
+
+    def vote(self, proposal, values):
+        for user, value in zip(self.board, values):
+            ProposalVoteBoard.objects.create(proposal=proposal, user=user,
+                                             value=value)
+
+    def test_board_vote_results(self):
+        pro, con, neutral = (ProposalVoteValue.PRO, ProposalVoteValue.CON,
+                             ProposalVoteValue.NEUTRAL)
+        self.vote(self.proposals[0], [pro, pro, con])
+        self.vote(self.proposals[1], [neutral, con])
+
+        with self.assertNumQueries(1):
+            results = board_vote_results(self.proposals, self.board)
+
+        r = results[self.proposals[0].id]
+        self.assertEquals({'pro_count': 2, 'con_count': 1, 'neut_count': 1},
+                          r['sums'])
+        self.assertEquals(3, r['total'])
+        self.assertEquals(con, r['per_user'][self.board[2]].value)
+        self.assertIsNone(r['per_user'][self.board[3]])
+
+        r = results[self.proposals[1].id]
+        self.assertEquals({'pro_count': 0, 'con_count': 1, 'neut_count': 3},
+                          r['sums'])
+        self.assertEquals(1, r['total'])
+
+        r = results[self.proposals[2].id]
+        self.assertEquals(0, r['total'])
+        self.assertEquals(4, r['sums']['neut_count'])
+
+    def test_board_vote_result(self):
+        self.vote(self.proposals[0], [ProposalVoteValue.PRO])
+
+        r = self.proposals[0].board_vote_result
+
+        self.assertEquals(1, r['total'])
+        self.assertEquals(ProposalVoteValue.PRO, r['per_user'][self.board[0]])
+        self.assertEquals(0, r['per_user'][self.board[1]])
+
+    def test_board_votes_cached(self):
+        pro, con = ProposalVoteValue.PRO, ProposalVoteValue.CON
+        self.vote(self.proposals[0], [pro, pro, con])
+        t = Template("{% load opencommunity %}"
+                     "{{ p|board_by_vote:'pro'|length }}"
+                     "{{ p|board_by_vote:'con'|length }}"
+                     "{{ p|board_by_vote:'neut'|length }}"
+                     "{{ p|board_votes_count }}")
+
+        with self.assertNumQueries(2):
+            html = t.render(Context({'p': self.proposals[0]}))
+
+        self.assertEquals("2104", html)
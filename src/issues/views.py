@@ -15,7 +15,8 @@ from issues.forms import CreateIssueForm, CreateProposalForm, EditProposalForm,
 from issues.models import ProposalType, Issue, IssueStatus, ProposalVote, \
     Proposal, ProposalVoteBoard, ProposalVoteValue, VoteResult
 from meetings.models import Meeting
-from oc_util.templatetags.opencommunity import minutes, board_voters_on_proposal
+from oc_util.templatetags.opencommunity import minutes, board_voters_on_proposal, \
+    invalidate_board_votes
 from ocd.base_views import CommunityMixin, AjaxFormView, json_response
 from ocd.validation import enhance_html
 from ocd.base_managers import ConfidentialSearchQuerySet
@@ -457,36 +458,9 @@ class ProposalDetailView(ProposalMixin, DetailView):
         return 'issues.acceptclosed_proposal' if p.decided_at_meeting else 'issues.acceptopen_proposal'
 
     def board_votes_dict(self):
-        total_votes = 0
-        votes_dict = { 'sums': {}, 'total': total_votes, 'per_user': {} }
-        pro_count = 0
-        con_count = 0
-        neut_count = 0
         board_attending = self.community.meeting_participants()['board']
-
-        for u in board_attending:
-            vote = ProposalVoteBoard.objects.filter(proposal=self.get_object,
-                                                    user=u)
-            if vote.exists():
-                votes_dict['per_user'][u] = vote[0]
-                if vote[0].value == 1:
-                    pro_count += 1
-                    total_votes += 1
-                elif vote[0].value == -1:
-                    con_count += 1
-                    total_votes += 1
-                elif vote[0].value == 0:
-                    neut_count += 1
-
-            else:
-                votes_dict['per_user'][u] = None
-                neut_count += 1
-
-        votes_dict['sums']['pro_count'] = pro_count
-        votes_dict['sums']['con_count'] = con_count
-        votes_dict['sums']['neut_count'] = neut_count
-        votes_dict['total'] = total_votes
-        return votes_dict
+        return models.board_vote_results([self.object],
+                                         board_attending)[self.object.id]
 
     def _init_board_votes(self, board_attending):
         p = self.get_object()
@@ -684,10 +658,15 @@ class ProposalVoteMixin(CommunityMixin):
         if not created and by_chairman and not vote.voted_by_chairman:
             # don't allow chairman vote override a board member existing vote!
             return (vote, self.VOTE_OVERRIDE_ERR)
+        old_value = None if created else vote.value
         vote.value=value
         if is_board:
             vote.voted_by_chairman = by_chairman
         vote.save()
+        if vote_class is ProposalVote:
+            models.update_live_votes(proposal.id, old_value, value)
+        else:
+            invalidate_board_votes(proposal)
         return (vote, self.VOTE_OK)
 
     def _vote_values_map(self, key):
@@ -749,6 +728,10 @@ class ProposalVoteView(ProposalVoteMixin, DetailView):
             vote = get_object_or_404(vote_class,
                                      proposal_id=pid, user_id=user_id)
             vote.delete()
+            if vote_class is ProposalVote:
+                models.update_live_votes(pid, vote.value, None)
+            else:
+                invalidate_board_votes(proposal)
             vote_response['html'] = render_to_string(vote_panel_tpl,
                     {
                         'proposal': proposal,
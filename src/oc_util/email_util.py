@@ -1,6 +1,11 @@
 
+from django.conf import settings
 from django.core.mail import get_connection
 from django.core.mail.message import EmailMultiAlternatives
+import logging
+
+
+logger = logging.getLogger(__name__)
 
 
 def fix_garbled_mail():
@@ -26,3 +31,51 @@ def send_mails(from_email, emails, subject, message, html_message=None,
                 emails]
     return connection.send_messages(messages)
 
+
+def send_messages_in_chunks(messages, chunk_size=None, retries=None,
+                            connection=None):
+    """Sends `messages` reusing a single connection.
+
+    The connection is recycled every `chunk_size` messages, as mail servers
+    usually limit the number of messages per session. A message that fails
+    is retried `retries` times over a fresh connection before giving up on
+    its recipients, without aborting the rest of the batch.
+
+    Returns a tuple of the number of messages sent and a list of the
+    recipients that could not be sent to, which is left to the caller to
+    report.
+
+    """
+    if chunk_size is None:
+        chunk_size = settings.OPENCOMMUNITY_EMAIL_CHUNK_SIZE
+    if retries is None:
+        retries = settings.OPENCOMMUNITY_EMAIL_RETRIES
+    connection = connection or get_connection()
+
+    sent = 0
+    failed = []
+
+    try:
+        for i in xrange(0, len(messages), chunk_size):
+            connection.close()
+            for message in messages[i:i + chunk_size]:
+                for attempt in xrange(retries + 1):
+                    try:
+                        connection.open()
+                        sent += connection.send_messages([message]) or 0
+                        break
+                    except Exception:
+                        logger.warning("Sending to %s failed (attempt %d)",
+                                       message.to, attempt + 1,
+                                       exc_info=True)
+                        # reconnect before trying again
+                        try:
+                            connection.close()
+                        except Exception:
+                            pass
+                else:
+                    failed.extend(message.to)
+    finally:
+        connection.close()
+
+    return sent, failed
@@ -181,43 +181,55 @@ def board_vote(proposal, val, participants):
     return [v.user for v in res]
 """
 
-def board_voters_on_proposal(proposal):
-    """ potential board voters """
-    if proposal.decided_at_meeting:
-        board_attn = proposal.decided_at_meeting.participations.board() 
+def _board_voters(proposal):
+    if proposal.decided_at_meeting_id:
+        board_attn = proposal.decided_at_meeting.participations.board()
     else:
         c = proposal.issue.community
         board_attn = c.memberships.board().filter(
                     user__in=c.upcoming_meeting_participants.all())
-        
-    participants = [b.user for b in board_attn]
-    return participants 
+
+    return [b.user for b in board_attn.select_related('user')]
+
+
+def invalidate_board_votes(proposal):
+    proposal.__dict__.pop('_board_votes_cache', None)
+
+
+def _board_votes(proposal):
+    """The board voters of a proposal and their votes, which the board vote
+    filters read from. Kept on the proposal after the first call; use
+    `invalidate_board_votes` after changing its votes.
+
+    """
+    if not hasattr(proposal, '_board_votes_cache'):
+        votes = dict(ProposalVoteBoard.objects.filter(proposal=proposal)
+                     .values_list('user_id', 'value'))
+        proposal._board_votes_cache = (_board_voters(proposal), votes)
+    return proposal._board_votes_cache
+
+
+def board_voters_on_proposal(proposal):
+    """ potential board voters """
+    return list(_board_votes(proposal)[0])
 
 
 @register.filter
 def board_votes_count(p):
-    return len(board_voters_on_proposal(p))
+    return len(_board_votes(p)[0])
 
 
 @register.filter
 def board_by_vote(p, val):
-    participants = board_voters_on_proposal(p)
+    participants, votes = _board_votes(p)
     if val == 'neut':
-        """
-        voter_ids = ProposalVoteBoard.objects.filter(proposal=p) \
-                    .exclude(value=ProposalVoteValue.NEUTRAL) \
-                    .values_list('user', flat=True)
-        return [u for u in participants if u.id not in voter_ids]
-        """
         vote = ProposalVoteValue.NEUTRAL
     elif val == 'pro':
         vote = ProposalVoteValue.PRO
     elif val == 'con':
         vote = ProposalVoteValue.CON
-    res = ProposalVoteBoard.objects.filter(proposal=p, value=vote, 
-                            user__in=participants)
-    
-    return [v.user for v in res]
+
+    return [u for u in participants if votes.get(u.id) == vote]
 
 """
 @register.simple_tag
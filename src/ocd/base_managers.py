@@ -4,6 +4,58 @@ from haystack.query import SearchQuerySet
 from users.default_roles import DefaultGroups
 
 
+class AccessLevel(object):
+
+    """The confidentiality tiers a user can be resolved to in a community."""
+
+    PUBLIC = 1  # non confidential objects only
+    CONFIDENTIAL = 2  # all objects
+
+
+def _access_level_of(groups):
+    if DefaultGroups.MEMBER in groups and len(groups) == 1:
+        return AccessLevel.PUBLIC
+    return AccessLevel.CONFIDENTIAL
+
+
+def get_access_level(user, community, memberships=None):
+    """Returns the `AccessLevel` of `user` in `community`.
+
+    `memberships` optionally maps user ids to their group name in the
+    community, so callers resolving many users at once can avoid a query
+    per user. Otherwise the level is looked up once and cached on the user
+    instance, like `users.permissions.get_community_permissions` does.
+
+    """
+
+    if hasattr(user, '_is_mock') and user._is_mock is True:
+        return AccessLevel.PUBLIC
+
+    elif user.is_superuser:
+        return AccessLevel.CONFIDENTIAL
+
+    elif user.is_anonymous():
+        return AccessLevel.PUBLIC
+
+    # we have a membership. return according to member's level.
+    # TODO: hook properly into permission system.
+    if memberships is not None:
+        return _access_level_of(
+            [memberships[user.id]] if user.id in memberships else [])
+
+    if not hasattr(user, '_community_access_cache'):
+        user._community_access_cache = {}
+
+    if community.id not in user._community_access_cache:
+        # imported here, as users.models depends on this module.
+        from users.models import get_membership_group
+        group = get_membership_group(user, community)
+        user._community_access_cache[community.id] = _access_level_of(
+            [group] if group else [])
+
+    return user._community_access_cache[community.id]
+
+
 class ActiveQuerySetMixin(object):
 
     """Exposes methods that can be used on both the manager and the queryset.
@@ -30,24 +82,9 @@ class ConfidentialQuerySetMixin(object):
             raise ValueError('The object access control method requires '
                              'both a user and a community object.')
 
-        if hasattr(user, '_is_mock') and user._is_mock is True:
+        if get_access_level(user, community) == AccessLevel.PUBLIC:
             return self.filter(is_confidential=False)
-
-        elif user.is_superuser:
-            return self.all()
-
-        elif user.is_anonymous():
-            return self.filter(is_confidential=False)
-
-        else:
-            # we have a membership. return according to member's level.
-            # TODO: hook properly into permission system.
-            memberships = user.memberships.filter(community=community)
-            lookup = [m.default_group_name for m in memberships]
-            if DefaultGroups.MEMBER in lookup and len(lookup) == 1:
-                return self.filter(is_confidential=False)
-            else:
-                return self.all()
+        return self.all()
 
 
 class ConfidentialQuerySet(QuerySet, ConfidentialQuerySetMixin):
@@ -67,13 +104,6 @@ class ConfidentialSearchQuerySet(SearchQuerySet):
             raise ValueError('The access validator requires both a user and '
                              'a community object.')
         qs = self._clone()
-        if user.is_superuser:
-            return qs
-        elif user.is_anonymous():
+        if get_access_level(user, community) == AccessLevel.PUBLIC:
             return qs.filter(is_confidential=False)
-        else:
-            memberships = user.memberships.filter(community=community)
-            lookup = [m.default_group_name for m in memberships]
-            if DefaultGroups.MEMBER in lookup and len(lookup) == 1:
-                return qs.filter(is_confidential=False)
         return qs
@@ -60,6 +60,10 @@ USE_L10N = True
 if 'test' in sys.argv:
     DATABASES['default'] = {'ENGINE': 'django.db.backends.sqlite3'}
     TEST_RUNNER = 'django_nose.NoseTestSuiteRunner'
+    # test databases are rolled back without signals, which would leave
+    # stale memberships in a shared cache.
+    CACHES = {'default': {
+        'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
     LANGUAGE_CODE ='en'
 LOCALE_PATHS = (
     ABSDIR('src/ocd/locale'),
@@ -281,6 +285,25 @@ OPENCOMMUNITY_DEFAULT_CONFIDENTIAL_REASONS = [
 
 OPENCOMMUNITY_ASYNC_NOTIFICATIONS = True
 
+# Notification mails are sent over a single connection, which is recycled
+# every OPENCOMMUNITY_EMAIL_CHUNK_SIZE messages.
+OPENCOMMUNITY_EMAIL_CHUNK_SIZE = 100
+OPENCOMMUNITY_EMAIL_RETRIES = 2
+
+# Async notifications are split into jobs of at most this many recipients.
+OPENCOMMUNITY_NOTIFICATION_SHARD_SIZE = 500
+
+# Seconds a user's membership in a community is cached for. The cache is
+# also invalidated whenever the membership changes, and memberships are not
+# cached at all unless local_settings sets CACHES to a cache shared across
+# processes (see local_settings.template).
+OPENCOMMUNITY_MEMBERSHIP_CACHE_TIMEOUT = 60 * 60
+
+# Issue ranking votes are recorded right away, while the community's issues
+# are re-ranked by a background job, at most once per this many seconds.
+OPENCOMMUNITY_ASYNC_ISSUE_RANKING = True
+OPENCOMMUNITY_ISSUE_RANKING_INTERVAL = 10
+
 version_file = os.path.join(STATIC_ROOT, 'version.txt')
 if os.path.exists(version_file):
     with open(version_file) as f:
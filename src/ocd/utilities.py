@@ -1,5 +1,67 @@
 import uuid
+from django.db import connection, transaction
+from haystack import connections, connection_router
+from haystack.exceptions import NotHandled
 
 
 def create_uuid():
     return uuid.uuid4().hex
+
+
+def update_search_index(queryset):
+    """Reindexes the objects of queryset in one batch per search backend.
+
+    Use after bulk writes (`update()`, `bulk_create()`), which do not send
+    the signals the search index is normally kept up to date with.
+
+    """
+    objects = list(queryset)
+    if not objects:
+        return
+    for using in connection_router.for_write():
+        try:
+            index = connections[using].get_unified_index().get_index(
+                queryset.model)
+        except NotHandled:
+            continue
+        connections[using].get_backend().update(index, objects)
+
+
+def update_in_bulk(model, values, **common):
+    """Writes per-row values to many rows of model in a single UPDATE.
+
+    values maps field names to {pk: value} dicts; rows missing from a field's
+    dict keep their current value. Extra keyword arguments are set on all
+    the rows.
+
+    """
+    pks = set()
+    for by_pk in values.values():
+        pks.update(by_pk)
+    if not pks:
+        return
+
+    opts = model._meta
+    qn = connection.ops.quote_name
+    pk_column = qn(opts.pk.column)
+    assignments = []
+    params = []
+    for name, by_pk in values.items():
+        column = qn(opts.get_field(name).column)
+        cases = []
+        for pk, value in by_pk.items():
+            cases.append('WHEN %s THEN %s')
+            params.extend([pk, value])
+        assignments.append('{0} = CASE {1} {2} ELSE {0} END'.format(
+            column, pk_column, ' '.join(cases)))
+    for name, value in common.items():
+        assignments.append('{0} = %s'.format(
+            qn(opts.get_field(name).column)))
+        params.append(value)
+    params.extend(pks)
+
+    sql = 'UPDATE {0} SET {1} WHERE {2} IN ({3})'.format(
+        qn(opts.db_table), ', '.join(assignments), pk_column,
+        ', '.join(['%s'] * len(pks)))
+    connection.cursor().execute(sql, params)
+    transaction.commit_unless_managed()
@@ -0,0 +1,123 @@
+"""
+Pairwise preference matrix, kept in memory and serialized as a whole.
+
+Not a django model! See IssuesGraph, which persists it per community.
+"""
+from array import array
+import base64
+import sys
+
+
+class PairwiseMatrix(object):
+    """
+    Square matrix of pairwise preferences between candidates.
+    weight(a, b) is the number of voters preferring candidate a over b.
+    Weights are kept row-major in a flat array of ints.
+    """
+
+    TYPECODE = 'i'
+
+    def __init__(self, candidates=(), weights=None):
+        self.candidates = list(candidates)
+        self.index = dict((c, i) for i, c in enumerate(self.candidates))
+        size = len(self.candidates)
+        if weights is None:
+            weights = array(self.TYPECODE, [0]) * (size * size)
+        assert len(weights) == size * size
+        self.weights = weights
+
+    def __len__(self):
+        return len(self.candidates)
+
+    def __contains__(self, candidate):
+        return candidate in self.index
+
+    def weight(self, a, b):
+        return self.weights[self.index[a] * len(self.candidates) +
+                            self.index[b]]
+
+    def set_weight(self, a, b, weight):
+        self.weights[self.index[a] * len(self.candidates) +
+                     self.index[b]] = weight
+
+    def add_candidates(self, candidates):
+        """
+        Add candidates with no preferences over any other candidate.
+        Candidates already in the matrix are ignored.
+        """
+        new = [c for c in candidates if c not in self.index]
+        if not new:
+            return
+        old_size = len(self.candidates)
+        size = old_size + len(new)
+        weights = array(self.TYPECODE, [0]) * (size * size)
+        for i in xrange(old_size):
+            weights[i * size:i * size + old_size] = \
+                self.weights[i * old_size:(i + 1) * old_size]
+        self.weights = weights
+        for c in new:
+            self.index[c] = len(self.candidates)
+            self.candidates.append(c)
+
+    def add_ballots(self, ballots, reverse=False):
+        """
+        Add (or with reverse=True, deduct) ballots in grouping notation:
+          [{'ballot': [[1], [2, 3], [4]], 'count': 2}, ...]
+        Candidates of a ballot are preferred over those of later groups, and
+        over the candidates other ballots rank but this one leaves out.
+        Candidates must already be in the matrix.
+        """
+        voted = set()
+        for ballot in ballots:
+            for group in ballot["ballot"]:
+                voted.update(group)
+        voted = [self.index[c] for c in voted]
+
+        size = len(self.candidates)
+        weights = self.weights
+        for ballot in ballots:
+            count = ballot.get("count", 1)
+            if reverse:
+                count = -count
+
+            # rank of each voted candidate; a candidate listed twice keeps
+            # its best rank, the ones left out are ranked last.
+            ranks = {}
+            for r, group in enumerate(ballot["ballot"]):
+                for c in group:
+                    ranks.setdefault(self.index[c], r)
+            last = len(ballot["ballot"])
+            ranked = [(ranks.get(i, last), i) for i in voted]
+
+            for r_a, a in ranked:
+                row = a * size
+                for r_b, b in ranked:
+                    if r_a < r_b:
+                        weights[row + b] += count
+
+    def as_edges_dict(self):
+        size = len(self.candidates)
+        return dict(((a, b), self.weights[i * size + j])
+                    for i, a in enumerate(self.candidates)
+                    for j, b in enumerate(self.candidates)
+                    if i != j)
+
+    def serialize(self):
+        """
+        Return (candidates, weights) strings, to be read by deserialize().
+        Weights are stored little-endian, whatever the platform is.
+        """
+        weights = array(self.TYPECODE, self.weights)
+        if sys.byteorder != 'little':
+            weights.byteswap()
+        return (",".join(str(c) for c in self.candidates),
+                base64.b64encode(weights.tostring()))
+
+    @classmethod
+    def deserialize(cls, candidates, weights):
+        candidates = [int(c) for c in candidates.split(",") if c]
+        data = array(cls.TYPECODE)
+        data.fromstring(base64.b64decode(weights))
+        if sys.byteorder != 'little':
+            data.byteswap()
+        return cls(candidates, data)
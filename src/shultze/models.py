@@ -1,10 +1,9 @@
-from django.db import models
+from django.db import models, transaction
 from issues.models import Issue
 from communities.models import Community
 from pyvotecore.condorcet import CondorcetHelper
 from pyvotecore.schulze_by_graph import SchulzeNPRByGraph
-from pyvotecore.schulze_method import SchulzeMethod #TODO: remove this when iteritems bug is solved
-import itertools
+from shultze.matrix import PairwiseMatrix
 from collections import defaultdict
 import math
 
@@ -68,26 +67,69 @@ class IssuesGraph(models.Model):
     """
     Graph-Issues class
     Graph level general functionality should go here, one-to-one relation with OpenCommunity Community
+
+    The graph's edges are kept as a PairwiseMatrix, stored as a whole in the
+    graph's IssuesGraphMatrix. IssueNode and IssueEdge rows of older graphs
+    are read once and converted.
     """
     community = models.ForeignKey(Community, related_name="shultze_issues_graph")
-    
+
+    def get_matrix(self):
+        """
+        Return the graph's PairwiseMatrix, as last loaded by this instance.
+        """
+        if not hasattr(self, '_matrix'):
+            self.load_matrix()
+        return self._matrix
+
+    def load_matrix(self, for_update=False):
+        """
+        (Re)load the graph's PairwiseMatrix from the database.
+        Use for_update=True inside a transaction to lock it while modifying.
+        """
+        stored = IssuesGraphMatrix.objects.filter(graph=self)
+        if for_update:
+            stored = stored.select_for_update()
+        stored = list(stored)
+        if stored:
+            self._matrix = stored[0].load()
+        else:
+            self._matrix = self._legacy_matrix()
+        return self._matrix
+
+    def _legacy_matrix(self):
+        candidates = self.nodes.values_list('issue_id', flat=True)
+        matrix = PairwiseMatrix(sorted(candidates))
+        for a, b, weight in self.edges.values_list(
+                'from_node__issue_id', 'to_node__issue_id', 'weight'):
+            matrix.set_weight(a, b, weight)
+        return matrix
+
+    def save_matrix(self):
+        """
+        Persist the graph's matrix in a single write.
+        """
+        candidates, weights = self.get_matrix().serialize()
+        updated = IssuesGraphMatrix.objects.filter(graph=self).update(
+            candidates=candidates, weights=weights)
+        if not updated:
+            IssuesGraphMatrix.objects.create(graph=self, candidates=candidates,
+                                             weights=weights)
+
     def initialize_graph(self):
         """
         Initialize candidates graph by community issues table.
         This should happen only once!
         """
-        candidates = list(self.community.issues.all())
-        candidate_nodes = []
-        for candidate in candidates:
-            candidate_nodes.append(IssueNode.objects.create(graph=self, issue=candidate))
-        for pair in itertools.permutations(candidate_nodes, 2):
-            IssueEdge.objects.create(graph=self, from_node=pair[0], to_node=pair[1], weight = 0)
-    
+        self._matrix = PairwiseMatrix(
+            self.community.issues.values_list('id', flat=True))
+        self.save_matrix()
+
     def add_ballots(self, ballots, tie_breaker=None, ballot_notation=None, reverse=False):
         """
         Add ballots of ordered issues.
-        Ballots are translated to their complementary graph using PyVoteCoreAssistance and the graph's 
-        edges values are added/deducted from the IssuesGraph instance.
+        Ballots are translated to their pairwise preferences, which are
+        added/deducted from the IssuesGraph instance's matrix.
         
         Example:
           input = [{'ballot': [[1], [2], [3], [4], [5]], 'count': 3},
@@ -99,44 +141,46 @@ class IssuesGraph(models.Model):
           g.add_ballots(input)
         
         use reverse=True to deduct the ballot from the IssuesGraph, reversing it's effect.
+        Ballots are in grouping notation; tie_breaker and ballot_notation are
+        ignored.
         """
-        output = SchulzeMethod(ballots, ballot_notation="grouping").as_dict() #TODO: remove this line when iteritems bug is solved
-        assistance = PyVoteCoreAssistance()
-        assistance.add_ballot(ballots, tie_breaker, ballot_notation)
-        for edge_key in assistance.pairs.keys():
-            try:
-                from_node = IssueNode.objects.get(issue_id = edge_key[0])
-            except IssueNode.DoesNotExist:
-                try:
-                    new_issue = Issue.objects.get(id = edge_key[0])
-                    from_node = self.add_node(new_issue)
-                except Issue.DoesNotExist:
-                    raise  # TODO: decide on proper exception
-            try:
-                to_node = IssueNode.objects.get(issue_id = edge_key[1])
-            except IssueNode.DoesNotExist:
-                try:
-                    new_issue = Issue.objects.get(id = edge_key[1])
-                    to_node = self.add_node(new_issue)
-                except Issue.DoesNotExist:
-                    raise  # TODO: decide on proper exception
-            edge = IssueEdge.objects.get(graph=self, from_node=from_node, to_node=to_node)
-            if reverse:
-                edge.weight -= assistance.pairs[edge_key]
-            else:
-                edge.weight += assistance.pairs[edge_key]
-            edge.save()
+        if reverse:
+            self.replace_ballots(ballots, [])
+        else:
+            self.replace_ballots([], ballots)
+
+    def replace_ballots(self, old_ballots, new_ballots):
+        """
+        Deduct old_ballots and add new_ballots, as when a voter changes their
+        vote, reading and writing the matrix once. Return the updated matrix.
+        """
+        with transaction.commit_on_success():
+            matrix = self.load_matrix(for_update=True)
+            self._add_candidates(set(c for ballot in old_ballots + new_ballots
+                                     for group in ballot["ballot"]
+                                     for c in group))
+            if old_ballots:
+                matrix.add_ballots(old_ballots, reverse=True)
+            if new_ballots:
+                matrix.add_ballots(new_ballots)
+            self.save_matrix()
+        return matrix
+
+    def _add_candidates(self, candidates):
+        new = set(candidates) - set(self.get_matrix().candidates)
+        if new and Issue.objects.filter(id__in=new).count() != len(new):
+            raise Issue.DoesNotExist  # TODO: decide on proper exception
+        self.get_matrix().add_candidates(sorted(new))
 
     def add_node(self, candidate):
-        node = IssueNode.objects.create(graph=self, issue=candidate)
-        for other_node in IssueNode.objects.filter(graph=self).exclude(issue=candidate):
-            IssueEdge.objects.create(graph=self, from_node=node, to_node=other_node, weight = 0)
-            IssueEdge.objects.create(graph=self, from_node=other_node, to_node=node, weight = 0)
-        return node
-    
-    def get_edges_dict(self):
+        with transaction.commit_on_success():
+            self.load_matrix(for_update=True).add_candidates([candidate.id])
+            self.save_matrix()
+
+    def get_edges_dict(self, reload=True):
         """
         Return the graph's edges in the form of an edges dictionary.
+        With reload=False, the matrix this instance last loaded is used.
         example:
           {
               ('a', 'b'): 8,
@@ -147,18 +191,16 @@ class IssuesGraph(models.Model):
               ('c', 'b'): 3,
           }
         """
-        edges_dict = dict()
-        for edge in IssueEdge.objects.filter(graph=self):
-            edges_dict[(edge.from_node.issue_id, edge.to_node.issue_id)] = edge.weight
-        return edges_dict
-    
+        matrix = self.load_matrix() if reload else self.get_matrix()
+        return matrix.as_edges_dict()
+
     def get_schulze_npr_results(self, winner_threshold=None, tie_breaker=None, ballot_notation=None):
         edges_dict = self.get_edges_dict()
         output = SchulzeNPRByGraph(edges_dict, winner_threshold, tie_breaker, ballot_notation).as_dict()
         return output
     
-    def get_schulze_npr_order_and_rating(self, winner_threshold=None, tie_breaker=None, ballot_notation=None):
-        edges_dict = self.get_edges_dict()
+    def get_schulze_npr_order_and_rating(self, winner_threshold=None, tie_breaker=None, ballot_notation=None, reload=True):
+        edges_dict = self.get_edges_dict(reload)
         output = SchulzeNPRByGraph(edges_dict, winner_threshold, tie_breaker, ballot_notation).as_dict()
         rated_order = []
         for round, (c1, c2) in enumerate(zip(output['order'], output['order'][1:])):
@@ -170,8 +212,8 @@ class IssuesGraph(models.Model):
             rated_order.append({(c1,c2): edges_dict[(c1,c2)] - edges_dict[(c2,c1)]})
         return rated_order
 
-    def get_schulze_npr_order_and_rating_bottom_up_sum(self, winner_threshold=None, tie_breaker=None, ballot_notation=None):
-        pairs_rating = self.get_schulze_npr_order_and_rating(winner_threshold=winner_threshold, tie_breaker=tie_breaker, ballot_notation=ballot_notation)
+    def get_schulze_npr_order_and_rating_bottom_up_sum(self, winner_threshold=None, tie_breaker=None, ballot_notation=None, reload=True):
+        pairs_rating = self.get_schulze_npr_order_and_rating(winner_threshold=winner_threshold, tie_breaker=tie_breaker, ballot_notation=ballot_notation, reload=reload)
 #        maximum = max(pair_rating.values()[0] for pair_rating in pairs_rating)
         running_sum = 0
         rated_order = []
@@ -198,9 +240,21 @@ class IssuesGraph(models.Model):
         return rated_order
 
 
+class IssuesGraphMatrix(models.Model):
+    """
+    Serialized PairwiseMatrix of an IssuesGraph, see PairwiseMatrix.serialize
+    """
+    graph = models.OneToOneField(IssuesGraph, related_name="matrix")
+    candidates = models.TextField(default='')
+    weights = models.TextField(default='')
+
+    def load(self):
+        return PairwiseMatrix.deserialize(self.candidates, self.weights)
+
+
 class IssueNode(models.Model):
     """
-    Issue-node class
+    Issue-node class (legacy, replaced by IssuesGraphMatrix)
     Node level functionality, one-to-one relation with OpenCommunity Issue
     related queries:
         node.in_edges
@@ -212,7 +266,7 @@ class IssueNode(models.Model):
 
 class IssueEdge(models.Model):
     """
-    Abstract graph directed edge class
+    Abstract graph directed edge class (legacy, replaced by IssuesGraphMatrix)
     Simple directed edge with numeric weight
     """
     graph = models.ForeignKey(IssuesGraph, related_name="edges")
@@ -18,6 +18,12 @@ from abstract_classes import SingleWinnerVotingSystem
 from pygraph.classes.digraph import digraph
 import itertools
 
+# NumPy is optional, it speeds up tallying pairwise preferences.
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 
 class CondorcetHelper(object):
 
@@ -66,17 +72,62 @@ class CondorcetHelper(object):
         else:
             self.condorcet_completion_method()
 
-    @staticmethod
-    def ballots_into_graph(candidates, ballots):
+    # "python", "numpy", or None to use numpy when it is installed
+    pairwise_engine = None
+
+    @classmethod
+    def ballots_into_pairs(cls, candidates, ballots):
+        engine = cls.pairwise_engine or ("numpy" if numpy else "python")
+        if engine == "numpy":
+            return cls.pairwise_preferences_numpy(candidates, ballots)
+        elif engine == "python":
+            return cls.pairwise_preferences(candidates, ballots)
+        else:
+            raise Exception("Unknown pairwise engine specified")
+
+    @classmethod
+    def ballots_into_graph(cls, candidates, ballots):
+        pairs = cls.ballots_into_pairs(candidates, ballots)
         graph = digraph()
         graph.add_nodes(candidates)
         for pair in itertools.permutations(candidates, 2):
-            graph.add_edge(pair, sum([
+            graph.add_edge(pair, pairs[pair])
+        return graph
+
+    @staticmethod
+    def pairwise_preferences(candidates, ballots):
+        return dict([
+            (pair, sum([
                 ballot["count"]
                 for ballot in ballots
                 if ballot["ballot"][pair[0]] > ballot["ballot"][pair[1]]
             ]))
-        return graph
+            for pair in itertools.permutations(candidates, 2)
+        ])
+
+    @staticmethod
+    def pairwise_preferences_numpy(candidates, ballots):
+        candidates = list(candidates)
+        if not ballots:
+            return dict([(pair, 0) for pair in
+                         itertools.permutations(candidates, 2)])
+        ratings = numpy.array([
+            [ballot["ballot"][candidate] for candidate in candidates]
+            for ballot in ballots
+        ])
+        counts = numpy.array([ballot["count"] for ballot in ballots])
+
+        # preferences[i][j] is the number of voters rating i over j
+        preferences = numpy.array([
+            counts.dot(ratings[:, i, numpy.newaxis] > ratings)
+            for i in range(len(candidates))
+        ]).tolist()
+        return dict([
+            ((a, b), preferences[i][j])
+            for i, a in enumerate(candidates)
+            for j, b in enumerate(candidates)
+            if i != j
+        ])
 
     @staticmethod
     def edge_weights(graph):
@@ -1,11 +1,12 @@
 from abstract_classes import AbstractSingleWinnerVotingSystem
 from stv import STV
+from functools import partial
 
 
 class IRV(AbstractSingleWinnerVotingSystem):
 
-    def __init__(self, ballots, tie_breaker=None):
-        super(IRV, self).__init__(ballots, STV, tie_breaker=tie_breaker)
+    def __init__(self, ballots, tie_breaker=None, engine=None):
+        super(IRV, self).__init__(ballots, partial(STV, engine=engine), tie_breaker=tie_breaker)
 
     def calculate_results(self):
         super(IRV, self).calculate_results()
@@ -19,15 +19,77 @@ from pygraph.algorithms.accessibility import accessibility, mutual_accessibility
 from pygraph.algorithms.cycles import find_cycle
 from common_functions import matching_keys
 from copy import deepcopy
+from itertools import groupby
+from operator import itemgetter
 
 
 # This class implements the Schulze Method (aka the beatpath method)
 class RankedPairs(CondorcetSystem, CondorcetHelper):
 
-    def __init__(self, ballots, tie_breaker=None, ballot_notation=None):
+    # "reachability" or "cycle_check" (a cycle search per pair)
+    ranked_pairs_engine = "reachability"
+
+    def __init__(self, ballots, tie_breaker=None, ballot_notation=None, engine=None):
+        if engine is not None:
+            self.ranked_pairs_engine = engine
         super(RankedPairs, self).__init__(ballots, tie_breaker=tie_breaker, ballot_notation=ballot_notation)
 
     def condorcet_completion_method(self):
+        if self.ranked_pairs_engine == "reachability":
+            self.lock_pairs_by_reachability()
+        elif self.ranked_pairs_engine == "cycle_check":
+            self.lock_pairs_by_cycle_check()
+        else:
+            raise Exception("Unknown Ranked Pairs engine specified")
+
+    # Sorts the strong pairs once, and keeps for every candidate the bitmask
+    # of the candidates its locked pairs reach, so a pair closes a cycle
+    # exactly when its loser already reaches its winner. Locking a pair
+    # extends the reach of the candidates that reach its winner, in O(C) big
+    # integer operations; the whole tally is within O(C^3).
+    def lock_pairs_by_reachability(self):
+
+        # Initialize the candidate graph
+        self.rounds = []
+        graph = digraph()
+        graph.add_nodes(self.candidates)
+        candidates = list(self.candidates)
+        index = dict((candidate, i) for i, candidate in enumerate(candidates))
+        reach = [1 << i for i in xrange(len(candidates))]
+
+        # Consider pairs from the strongest down, breaking ties among the
+        # remaining pairs of the same strength one at a time
+        strong_pairs = sorted(self.strong_pairs.iteritems(), key=itemgetter(1), reverse=True)
+        for strength, group in groupby(strong_pairs, key=itemgetter(1)):
+            tied_pairs = set(pair for pair, weight in group)
+            while len(tied_pairs) > 0:
+                r = {}
+                if len(tied_pairs) > 1:
+                    r["tied_pairs"] = set(tied_pairs)
+                    strongest_pair = self.break_ties(tied_pairs)
+                else:
+                    strongest_pair = list(tied_pairs)[0]
+                tied_pairs.remove(strongest_pair)
+                r["pair"] = strongest_pair
+
+                # If the pair would add a cycle, skip it
+                winner, loser = index[strongest_pair[0]], index[strongest_pair[1]]
+                if reach[loser] >> winner & 1:
+                    r["action"] = "skipped"
+                else:
+                    r["action"] = "added"
+                    graph.add_edge(strongest_pair)
+                    winner_bit = 1 << winner
+                    for i, reached in enumerate(reach):
+                        if reached & winner_bit:
+                            reach[i] = reached | reach[loser]
+                self.rounds.append(r)
+
+        self.old_graph = self.graph
+        self.graph = graph
+        self.graph_winner()
+
+    def lock_pairs_by_cycle_check(self):
 
         # Initialize the candidate graph
         self.rounds = []
@@ -17,14 +17,15 @@ from schulze_method import SchulzeMethod
 from schulze_helper import SchulzeHelper
 from abstract_classes import AbstractOrderingVotingSystem
 from pygraph.classes.digraph import digraph
+from functools import partial
 
 
 # This class provides Schulze Method results, but bypasses ballots and uses preference tallies instead.
 class SchulzeMethodByGraph(SchulzeMethod):
 
-    def __init__(self, edges, tie_breaker=None, ballot_notation=None):
+    def __init__(self, edges, tie_breaker=None, ballot_notation=None, engine=None):
         self.edges = edges
-        super(SchulzeMethodByGraph, self).__init__([], tie_breaker=tie_breaker, ballot_notation=ballot_notation)
+        super(SchulzeMethodByGraph, self).__init__([], tie_breaker=tie_breaker, ballot_notation=ballot_notation, engine=engine)
 
     def standardize_ballots(self, ballots, ballot_notation):
         self.ballots = []
@@ -42,11 +43,17 @@ class SchulzeMethodByGraph(SchulzeMethod):
 
 class SchulzeNPRByGraph(AbstractOrderingVotingSystem, SchulzeHelper):
 
-    def __init__(self, edges, winner_threshold=None, tie_breaker=None, ballot_notation=None):
+    # "single_pass" (orders the candidates from the edges once) or "rounds"
+    # (runs a SchulzeMethodByGraph per position, with the given engine)
+    npr_ordering = "single_pass"
+
+    def __init__(self, edges, winner_threshold=None, tie_breaker=None, ballot_notation=None, engine=None, ordering=None):
+        if ordering is not None:
+            self.npr_ordering = ordering
         self.edges = edges
         self.candidates = set([edge[0] for edge, weight in edges.iteritems()]) | set([edge[1] for edge, weight in edges.iteritems()])
         super(SchulzeNPRByGraph, self).__init__([],
-            single_winner_class=SchulzeMethodByGraph,
+            single_winner_class=partial(SchulzeMethodByGraph, engine=engine),
             winner_threshold=winner_threshold,
             tie_breaker=tie_breaker,
         )
@@ -57,4 +64,9 @@ class SchulzeNPRByGraph(AbstractOrderingVotingSystem, SchulzeHelper):
 
     def calculate_results(self):
         self.ballots = self.edges
-        super(SchulzeNPRByGraph, self).calculate_results()
+        if self.npr_ordering == "single_pass":
+            self.schulze_ordering(self.candidates, self.edges)
+        elif self.npr_ordering == "rounds":
+            super(SchulzeNPRByGraph, self).calculate_results()
+        else:
+            raise Exception("Unknown Schulze NPR ordering specified")
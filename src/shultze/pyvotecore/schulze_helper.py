@@ -16,8 +16,10 @@
 from pygraph.algorithms.accessibility import accessibility, mutual_accessibility
 from pygraph.classes.digraph import digraph
 from pygraph.algorithms.minmax import maximum_flow
-from condorcet import CondorcetHelper
+from condorcet import CondorcetHelper, numpy
 from common_functions import matching_keys, unique_permutations
+from tie_breaker import TieBreaker
+from array import array
 
 PREFERRED_LESS = 1
 PREFERRED_SAME = 2
@@ -30,8 +32,16 @@ STRENGTH_THRESHOLD = 0.1
 
 class SchulzeHelper(CondorcetHelper):
 
+    # "heuristic" (the Schwartz set heuristic) or "widest_path"
+    schulze_engine = "heuristic"
+
     def condorcet_completion_method(self):
-        self.schwartz_set_heuristic()
+        if self.schulze_engine == "widest_path":
+            self.widest_path_winner()
+        elif self.schulze_engine == "heuristic":
+            self.schwartz_set_heuristic()
+        else:
+            raise Exception("Unknown Schulze engine specified")
 
     def schwartz_set_heuristic(self):
 
@@ -59,6 +69,116 @@ class SchulzeHelper(CondorcetHelper):
 
         self.graph_winner()
 
+    # Computes the strength of the strongest path between every two candidates
+    # with the Floyd-Warshall algorithm (widest path variant), in O(C^3). The
+    # winners are the candidates whose strongest paths to every other
+    # candidate are at least as strong as the ones back.
+    def widest_path_winner(self):
+        candidates = list(self.graph.nodes())
+        size = len(candidates)
+        index = dict((candidate, i) for i, candidate in enumerate(candidates))
+        strengths = array('d', [0]) * (size * size)
+        for (a, b), weight in self.edge_weights(self.graph).iteritems():
+            strengths[index[a] * size + index[b]] = weight
+
+        winning_candidates = set(candidates[i] for i in self.strongest_path_winners(strengths, size))
+        if len(winning_candidates) == 1:
+            self.winner = list(winning_candidates)[0]
+        else:
+            self.tied_winners = winning_candidates
+            self.winner = self.break_ties(winning_candidates)
+
+    # Returns the indices of the candidates whose strongest paths to every
+    # other candidate are at least as strong as the ones back, given the
+    # flat, row-major matrix of their strong pairs.
+    @classmethod
+    def strongest_path_winners(cls, strengths, size):
+        if numpy is not None:
+            strengths = cls.strongest_paths_numpy(strengths, size)
+        else:
+            cls.strongest_paths(strengths, size)
+        return [
+            i for i in xrange(size)
+            if all(strengths[i * size + j] >= strengths[j * size + i]
+                   for j in xrange(size))
+        ]
+
+    # Orders the candidates as AbstractOrderingVotingSystem does with
+    # SchulzeMethod rounds, from their pairwise preferences: the strong
+    # pairs are found once, and each round only drops its winner. A round
+    # is won by the candidates no remaining candidate beats, or if there are
+    # none, by the Schulze winners of the remaining candidates.
+    def schulze_ordering(self, candidates, pairs):
+        self.candidates = set(candidates)
+        candidates = list(candidates)
+        size = len(candidates)
+        strong = array('d', [0]) * (size * size)
+        beats = [[] for i in xrange(size)]
+        beaten = [0] * size
+        for i, a in enumerate(candidates):
+            for j, b in enumerate(candidates):
+                if i != j and pairs.get((a, b), 0) > pairs.get((b, a), 0):
+                    strong[i * size + j] = pairs[(a, b)]
+                    beats[i].append(j)
+                    beaten[j] += 1
+
+        self.order = []
+        self.rounds = []
+        remaining = range(size)
+        while (not self.order or len(remaining) > 1) and (self.winner_threshold == None or len(self.order) < self.winner_threshold):
+            winners = [i for i in remaining if not beaten[i]]
+            if not winners:
+                winners = [remaining[i] for i in self.strongest_path_winners(
+                    array('d', [strong[i * size + j] for i in remaining for j in remaining]), len(remaining))]
+
+            r = {}
+            if len(winners) == 1:
+                winner = winners[0]
+            else:
+                r['tied_winners'] = set(candidates[i] for i in winners)
+                if self.tie_breaker == None:
+                    self.tie_breaker = TieBreaker(set(candidates[i] for i in remaining))
+                winner = candidates.index(self.tie_breaker.break_ties(r['tied_winners']))
+            r['winner'] = candidates[winner]
+            self.order.append(r['winner'])
+            self.rounds.append(r)
+
+            remaining.remove(winner)
+            for j in beats[winner]:
+                beaten[j] -= 1
+
+        # Note the last remaining candidate
+        if (self.winner_threshold == None or len(self.order) < self.winner_threshold):
+            r = {'winner': candidates[remaining[0]]}
+            self.order.append(r['winner'])
+            self.rounds.append(r)
+
+    # Widens the paths of a flat, row-major strength matrix in place
+    @staticmethod
+    def strongest_paths(strengths, size):
+        for k in xrange(size):
+            row_k = k * size
+            for i in xrange(size):
+                through_k = strengths[i * size + k]
+                if i == k or not through_k:
+                    continue
+                row_i = i * size
+                for j in xrange(size):
+                    if j == i or j == k:
+                        continue
+                    strength = min(through_k, strengths[row_k + j])
+                    if strength > strengths[row_i + j]:
+                        strengths[row_i + j] = strength
+
+    @staticmethod
+    def strongest_paths_numpy(strengths, size):
+        matrix = numpy.array(strengths).reshape(size, size)
+        for k in xrange(size):
+            through_k = numpy.minimum(matrix[:, k, numpy.newaxis], matrix[k, :])
+            numpy.maximum(matrix, through_k, out=matrix)
+        numpy.fill_diagonal(matrix, 0)
+        return matrix.ravel().tolist()
+
     def generate_vote_management_graph(self):
         self.vote_management_graph = digraph()
         self.vote_management_graph.add_nodes(self.completed_patterns)
@@ -87,6 +207,91 @@ class SchulzeHelper(CondorcetHelper):
                 self.completed_patterns.append(tuple(pattern))
 
     def proportional_completion(self, candidate, other_candidates):
+        if numpy is not None:
+            return self.proportional_completion_by_array(candidate, other_candidates)
+        return self.proportional_completion_by_dict(candidate, other_candidates)
+
+    # Patterns are numbered in base 3, the i-th digit being pattern[i] - 1.
+    # Returns a table of the digits of every pattern, and the numbers of the
+    # completed patterns.
+    def pattern_digits(self):
+        if getattr(self, '_pattern_digits', (None,))[0] != self.required_winners:
+            powers = 3 ** numpy.arange(self.required_winners)
+            digits = (numpy.arange(3 ** self.required_winners)[:, numpy.newaxis] // powers) % 3
+            completed_ids = (numpy.array(self.completed_patterns) - 1).dot(powers)
+            self._pattern_digits = (self.required_winners, powers, digits, completed_ids)
+        return self._pattern_digits[1:]
+
+    # The same as proportional_completion_by_dict, with the profile kept in a
+    # dense array indexed by pattern number.
+    def proportional_completion_by_array(self, candidate, other_candidates):
+        powers, digits, completed_ids = self.pattern_digits()
+        if not hasattr(self, '_ballot_ratings'):
+            candidates = list(self.candidates)
+            self._ballot_ratings = (
+                dict((c, i) for i, c in enumerate(candidates)),
+                numpy.array([[ballot["ballot"][c] for c in candidates] for ballot in self.ballots]),
+                numpy.array([ballot["count"] for ballot in self.ballots], dtype=float),
+            )
+        index, ratings, counts = self._ballot_ratings
+
+        # Obtain an initial tally from the ballots
+        others = [index[c] for c in other_candidates]
+        ballot_ids = (1 + numpy.sign(ratings[:, [index[candidate]]] - ratings[:, others])).astype(int).dot(powers)
+        profile = numpy.bincount(ballot_ids, weights=counts, minlength=len(digits))
+        present = numpy.zeros(len(digits), dtype=bool)
+        present[completed_ids] = True
+        present[ballot_ids] = True
+        weight_sum = profile.sum()
+
+        # Peel off patterns with indifference (from the most to the least) in
+        # the order proportional_completion_by_dict does, which matters among
+        # patterns with as much indifference.
+        order = dict.fromkeys(self.completed_patterns)
+        first_ids, first_ballots = numpy.unique(ballot_ids, return_index=True)
+        for i in first_ids[numpy.argsort(first_ballots)]:
+            order[tuple(digits[i] + 1)] = None
+        for pattern in sorted(order, key=lambda pattern: pattern.count(PREFERRED_SAME), reverse=True):
+            if pattern.count(PREFERRED_SAME) == 0:
+                break
+            self.proportional_completion_round_by_array(
+                (numpy.array(pattern) - 1).dot(powers), profile, present, digits, powers)
+
+        if round(weight_sum, 5) != round(profile.sum(), 5):
+            raise Exception("Proportional completion broke (went from %s to %s)" % (weight_sum, profile.sum()))
+
+        return dict(zip(self.completed_patterns, profile[completed_ids].tolist()))
+
+    @staticmethod
+    def proportional_completion_round_by_array(completion_id, profile, present, digits, powers):
+
+        # Remove pattern that contains indifference
+        completion_weight = profile[completion_id]
+        profile[completion_id] = 0
+        present[completion_id] = False
+
+        # Each pattern breaking some of the indifference is considered for
+        # the pattern it breaks it to, if that one is in the profile.
+        same = digits[completion_id] == PREFERRED_SAME - 1
+        patterns = numpy.flatnonzero(present)
+        breaking = digits[patterns][:, same]
+        targets = completion_id + (breaking - 1).dot(powers[same])
+        considered = (breaking != PREFERRED_SAME - 1).any(axis=1) & present[targets]
+        patterns = patterns[considered]
+        targets = targets[considered]
+        if not len(targets):
+            return
+
+        # Reweight the targets
+        denominator = profile[patterns].sum()
+        unique_targets = numpy.unique(targets)
+        if denominator == 0:
+            profile[unique_targets] += completion_weight / len(unique_targets)
+        else:
+            sums = numpy.bincount(targets, weights=profile[patterns], minlength=len(profile))
+            profile[unique_targets] += sums[unique_targets] * completion_weight / denominator
+
+    def proportional_completion_by_dict(self, candidate, other_candidates):
         profile = dict(zip(self.completed_patterns, [0] * len(self.completed_patterns)))
 
         # Obtain an initial tally from the ballots
@@ -111,10 +316,8 @@ class SchulzeHelper(CondorcetHelper):
                 break
             self.proportional_completion_round(pattern, profile)
 
-        try:
-            assert round(weight_sum,5) == round(sum(profile.values()),5)
-        except:
-            print "Proportional completion broke (went from %s to %s)" % (weight_sum, sum(profile.values()))
+        if round(weight_sum, 5) != round(sum(profile.values()), 5):
+            raise Exception("Proportional completion broke (went from %s to %s)" % (weight_sum, sum(profile.values())))
 
         return profile
 
@@ -158,20 +361,70 @@ class SchulzeHelper(CondorcetHelper):
                     profile[pattern] = 0
                 profile[pattern] += sum(profile[considered_pattern] for considered_pattern in patterns_to_consider[pattern]) * completion_pattern_weight / denominator
 
-        try:
-            assert round(weight_sum,5) == round(sum(profile.values()),5)
-        except:
-            print "Proportional completion round broke (went from %s to %s)" % (weight_sum, sum(profile.values()))
+        if round(weight_sum, 5) != round(sum(profile.values()), 5):
+            raise Exception("Proportional completion round broke (went from %s to %s)" % (weight_sum, sum(profile.values())))
 
         return profile
 
-    # This method converts the voter profile into a capacity graph and iterates
-    # on the maximum flow using the Edmonds Karp algorithm. The end result is
-    # the limit of the strength of the voter management as per Markus Schulze's
-    # Calcul02.pdf (draft, 28 March 2008, abstract: "In this paper we illustrate
-    # the calculation of the strengths of the vote managements.").
+    # This method finds the limit of the strength of the voter management as
+    # per Markus Schulze's Calcul02.pdf (draft, 28 March 2008, abstract: "In
+    # this paper we illustrate the calculation of the strengths of the vote
+    # managements."), iterating on the maximum flow of the vote management
+    # graph. Many candidate sets complete to the same voter profile, so the
+    # strengths are cached by profile.
     def strength_of_vote_management(self, voter_profile):
+        if not hasattr(self, 'vote_management_strengths'):
+            self.vote_management_strengths = {}
+        key = (self.required_winners, tuple(voter_profile[pattern] for pattern in self.completed_patterns))
+        if key not in self.vote_management_strengths:
+            self.vote_management_strengths[key] = self.strength_of_vote_management_by_cuts(voter_profile)
+        return self.vote_management_strengths[key]
+
+    # The vote management graph always has the same topology: source ->
+    # pattern -> each winner the pattern prefers the candidate over -> sink.
+    # Its minimum cut puts a set T of winners on the source side (paying r
+    # each) and cuts off every pattern preferring the candidate to a winner
+    # outside T, so the maximum flow is:
+    #   min over T of r * |T| + total - (weight of the patterns within T)
+    # Only the heaviest pattern weight for each size of T matters; these are
+    # found once per profile with a subset-sum over the winner bitmasks.
+    def strength_of_vote_management_by_cuts(self, voter_profile):
+
+        # Sum the weight of the patterns within each set of winners
+        within = array('d', [0]) * (1 << self.required_winners)
+        for pattern in self.pattern_nodes:
+            mask = 0
+            for i in range(self.required_winners):
+                if pattern[i] == PREFERRED_LESS:
+                    mask |= 1 << i
+            within[mask] += voter_profile[pattern]
+        for i in range(self.required_winners):
+            bit = 1 << i
+            for mask in range(len(within)):
+                if mask & bit:
+                    within[mask] += within[mask ^ bit]
+        heaviest = [0.0] * (self.required_winners + 1)
+        for mask, weight in enumerate(within):
+            size = bin(mask).count("1")
+            heaviest[size] = max(heaviest[size], weight)
+        total = within[-1]
+
+        # Iterate towards the limit
+        r = [(float(sum(voter_profile.values())) - voter_profile[tuple([PREFERRED_MORE] * self.required_winners)]) / self.required_winners]
+        while len(r) < 2 or r[-2] - r[-1] > STRENGTH_TOLERANCE:
+            sink_sum = min(r[-1] * size + total - heaviest[size] for size in range(self.required_winners + 1))
+            r.append(sink_sum / self.required_winners)
+
+            # We expect strengths to be above a specified threshold
+            if sink_sum < STRENGTH_THRESHOLD:
+                return 0
+
+        # Return the final max flow
+        return round(r[-1], 9)
 
+    # The same, computing the maximum flows on the capacity graph with the
+    # Edmonds Karp algorithm. Much slower, kept as a reference.
+    def strength_of_vote_management_by_graph(self, voter_profile):
         # Initialize the graph weights
         for pattern in self.pattern_nodes:
             self.vote_management_graph.set_edge_weight(("source", pattern), voter_profile[pattern])
@@ -21,7 +21,9 @@ from condorcet import CondorcetSystem
 
 class SchulzeMethod(CondorcetSystem, SchulzeHelper):
 
-    def __init__(self, ballots, tie_breaker=None, ballot_notation=None):
+    def __init__(self, ballots, tie_breaker=None, ballot_notation=None, engine=None):
+        if engine is not None:
+            self.schulze_engine = engine
         super(SchulzeMethod, self).__init__(ballots, tie_breaker=tie_breaker, ballot_notation=ballot_notation)
 
     def as_dict(self):
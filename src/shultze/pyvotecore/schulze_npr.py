@@ -16,20 +16,36 @@
 from abstract_classes import AbstractOrderingVotingSystem
 from schulze_helper import SchulzeHelper
 from schulze_method import SchulzeMethod
+from functools import partial
 
 #
 
 
 class SchulzeNPR(AbstractOrderingVotingSystem, SchulzeHelper):
 
-    def __init__(self, ballots, winner_threshold=None, tie_breaker=None, ballot_notation=None):
+    # "single_pass" (orders the candidates from a single tally of the
+    # ballots) or "rounds" (runs a SchulzeMethod per position, with the
+    # given engine)
+    npr_ordering = "single_pass"
+
+    def __init__(self, ballots, winner_threshold=None, tie_breaker=None, ballot_notation=None, engine=None, ordering=None):
+        if ordering is not None:
+            self.npr_ordering = ordering
         self.standardize_ballots(ballots, ballot_notation)
         super(SchulzeNPR, self).__init__(self.ballots,
-            single_winner_class=SchulzeMethod,
+            single_winner_class=partial(SchulzeMethod, engine=engine),
             winner_threshold=winner_threshold,
             tie_breaker=tie_breaker,
         )
 
+    def calculate_results(self):
+        if self.npr_ordering == "single_pass":
+            self.schulze_ordering(self.candidates, self.ballots_into_pairs(self.candidates, self.ballots))
+        elif self.npr_ordering == "rounds":
+            super(SchulzeNPR, self).calculate_results()
+        else:
+            raise Exception("Unknown Schulze NPR ordering specified")
+
     @staticmethod
     def ballots_without_candidate(ballots, candidate):
         for ballot in ballots:
@@ -18,11 +18,29 @@ from abstract_classes import MultipleWinnerVotingSystem
 from schulze_helper import SchulzeHelper
 from pygraph.classes.digraph import digraph
 import itertools
+import multiprocessing
+
+# The helper each worker process computes the strengths of vote managements with
+_worker_helper = None
+
+
+def _init_worker(helper):
+    global _worker_helper
+    _worker_helper = helper
+
+
+def _vote_management_strength(completion):
+    candidate, other_candidates = completion
+    completed = _worker_helper.proportional_completion(candidate, other_candidates)
+    return _worker_helper.strength_of_vote_management(completed)
 
 
 class SchulzeSTV(MultipleWinnerVotingSystem, SchulzeHelper):
 
-    def __init__(self, ballots, tie_breaker=None, required_winners=1, ballot_notation=None):
+    # processes: number of processes to compute the edges of the graph with,
+    # None to compute them in this process.
+    def __init__(self, ballots, tie_breaker=None, required_winners=1, ballot_notation=None, processes=None):
+        self.processes = processes
         self.standardize_ballots(ballots, ballot_notation)
         super(SchulzeSTV, self).__init__(self.ballots, tie_breaker=tie_breaker, required_winners=required_winners)
 
@@ -43,14 +61,16 @@ class SchulzeSTV(MultipleWinnerVotingSystem, SchulzeHelper):
             self.graph.add_nodes([tuple(sorted(list(candidate_set)))])
 
         # Generate the edges between nodes
-        for candidate_set in itertools.combinations(self.candidates, self.required_winners + 1):
-            for candidate in candidate_set:
-                other_candidates = sorted(set(candidate_set) - set([candidate]))
-                completed = self.proportional_completion(candidate, other_candidates)
-                weight = self.strength_of_vote_management(completed)
-                if weight > 0:
-                    for subset in itertools.combinations(other_candidates, len(other_candidates) - 1):
-                        self.graph.add_edge((tuple(other_candidates), tuple(sorted(list(subset) + [candidate]))), weight)
+        completions = [
+            (candidate, sorted(set(candidate_set) - set([candidate])))
+            for candidate_set in itertools.combinations(self.candidates, self.required_winners + 1)
+            for candidate in candidate_set
+        ]
+        weights = self.strengths_of_vote_managements(completions)
+        for (candidate, other_candidates), weight in itertools.izip(completions, weights):
+            if weight > 0:
+                for subset in itertools.combinations(other_candidates, len(other_candidates) - 1):
+                    self.graph.add_edge((tuple(other_candidates), tuple(sorted(list(subset) + [candidate]))), weight)
 
         # Determine the winner through the Schwartz set heuristic
         self.graph_winner()
@@ -59,6 +79,34 @@ class SchulzeSTV(MultipleWinnerVotingSystem, SchulzeHelper):
         self.winners = set(self.winner)
         del self.winner
 
+    # Returns the strength of the vote management of each (candidate, other
+    # candidates) completion, in order. These are independent of each other,
+    # so they are spread over a pool of processes if asked to.
+    def strengths_of_vote_managements(self, completions):
+        if not self.processes or self.processes < 2:
+            return [
+                self.strength_of_vote_management(self.proportional_completion(candidate, other_candidates))
+                for candidate, other_candidates in completions
+            ]
+
+        # Workers only need what proportional completion and the strength
+        # computations use, not the whole voting system.
+        helper = SchulzeHelper()
+        helper.ballots = self.ballots
+        helper.candidates = self.candidates
+        helper.required_winners = self.required_winners
+        helper.completed_patterns = self.completed_patterns
+        helper.pattern_nodes = self.pattern_nodes
+        helper.vote_management_graph = self.vote_management_graph
+
+        pool = multiprocessing.Pool(self.processes, _init_worker, (helper,))
+        try:
+            chunksize = max(1, len(completions) // (self.processes * 4))
+            return pool.map(_vote_management_strength, completions, chunksize)
+        finally:
+            pool.close()
+            pool.join()
+
     def as_dict(self):
         data = super(SchulzeSTV, self).as_dict()
         if hasattr(self, 'actions'):
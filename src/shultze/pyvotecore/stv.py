@@ -14,6 +14,8 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 from abstract_classes import MultipleWinnerVotingSystem
+from collections import defaultdict
+from fractions import Fraction
 import math
 import copy
 from common_functions import matching_keys
@@ -26,7 +28,12 @@ from common_functions import matching_keys
 
 class STV(MultipleWinnerVotingSystem):
 
-    def __init__(self, ballots, tie_breaker=None, required_winners=1):
+    # "buckets" or "ballots" (every ballot retallied each round)
+    stv_engine = "buckets"
+
+    def __init__(self, ballots, tie_breaker=None, required_winners=1, engine=None):
+        if engine is not None:
+            self.stv_engine = engine
         super(STV, self).__init__(ballots, tie_breaker=tie_breaker, required_winners=required_winners)
 
     def calculate_results(self):
@@ -39,8 +46,119 @@ class STV(MultipleWinnerVotingSystem):
         self.quota = STV.droop_quota(self.ballots, self.required_winners)
         self.rounds = []
         self.winners = set()
+        remaining_candidates = copy.copy(self.candidates)
+        if self.stv_engine == "buckets":
+            self.count_by_buckets(remaining_candidates)
+        elif self.stv_engine == "ballots":
+            self.count_by_ballots(remaining_candidates)
+        else:
+            raise Exception("Unknown STV engine specified")
+
+        # Append the final winner and return
+        if len(self.winners) < self.required_winners:
+            self.remaining_candidates = remaining_candidates
+            self.winners |= self.remaining_candidates
+
+    # Collapses identical preference orders into weighted unique ballots, kept
+    # in buckets by their first remaining preference. Electing or eliminating
+    # a candidate only transfers its own bucket, and only the tallies of the
+    # buckets it changed are summed again, so a count takes time in the
+    # number of distinct ballots rather than of voters. Weights are kept
+    # exact, as merged ballots would otherwise round differently from the
+    # ones they replace; tallies are only reported as floats.
+    def count_by_buckets(self, remaining_candidates):
+
+        # Collapse identical ballots
+        orders, counts, index = [], [], {}
+        for ballot in self.ballots:
+            order = tuple(ballot["ballot"])
+            if order not in index:
+                index[order] = len(orders)
+                orders.append(order)
+                counts.append(0.0)
+            counts[index[order]] += ballot["count"]
+        counts = [Fraction(count) for count in counts]
+
+        quota = self.quota
+        removed = set()
+        weights = list(counts)
+        positions = [0] * len(orders)
+        buckets = defaultdict(list)
+        tallies = {}
+
+        # Moves ballots on to their next remaining preference, and returns
+        # the candidates whose buckets they land in
+        def transfer(ballot_ids):
+            changed = set()
+            for i in ballot_ids:
+                order, position = orders[i], positions[i]
+                while position < len(order) and order[position] in removed:
+                    position += 1
+                positions[i] = position
+                if position < len(order):
+                    buckets[order[position]].append(i)
+                    changed.add(order[position])
+            return changed
+
+        def retally(candidates):
+            for candidate in candidates:
+                tallies[candidate] = sum(weights[i] for i in buckets[candidate])
+
+        retally(transfer(xrange(len(orders))))
+
+        # Loop until we have enough candidates
+        while len(self.winners) < self.required_winners and len(remaining_candidates) + len(self.winners) > self.required_winners:
+
+            # If all the votes have been used up, start from scratch for the remaining candidates
+            round = {}
+            if not any(weight > 0 for weight in weights):
+                round["note"] = "reset"
+                weights = list(counts)
+                positions = [0] * len(orders)
+                buckets.clear()
+                tallies.clear()
+                retally(transfer(xrange(len(orders))))
+                quota = STV.droop_quota(self.ballots, self.required_winners - len(self.winners))
+
+            # If any candidates meet or exceeds the quota, they're a winner
+            positive_tallies = dict((candidate, tally) for (candidate, tally) in tallies.iteritems() if tally > 0)
+            round["tallies"] = dict((candidate, float(tally)) for (candidate, tally) in positive_tallies.iteritems())
+            if max(positive_tallies.values()) >= quota:
+
+                # Collect candidates as winners
+                round["winners"] = set([
+                    candidate
+                    for candidate, tally in positive_tallies.items()
+                    if tally >= self.quota
+                ])
+                self.winners |= round["winners"]
+                remaining_candidates -= round["winners"]
+                removed |= round["winners"]
+
+                # Redistribute excess votes
+                changed = set()
+                for candidate in round["winners"]:
+                    tally = positive_tallies[candidate]
+                    for i in buckets[candidate]:
+                        weights[i] *= (tally - self.quota) / tally
+                    changed |= transfer(buckets.pop(candidate))
+                    del tallies[candidate]
+                retally(changed)
+
+            # If no candidate exceeds the quota, elimiate the least preferred
+            else:
+                round.update(self.loser(positive_tallies))
+                remaining_candidates.remove(round["loser"])
+                removed.add(round["loser"])
+                retally(transfer(buckets.pop(round["loser"])))
+                del tallies[round["loser"]]
+
+            # Record this round's actions
+            self.rounds.append(round)
+
+    def count_by_ballots(self, remaining_candidates):
+
         quota = self.quota
-        remaining_candidates = copy.deepcopy(self.candidates)
         ballots = copy.deepcopy(self.ballots)
 
         # Loop until we have enough candidates
@@ -85,11 +203,6 @@ class STV(MultipleWinnerVotingSystem):
             # Record this round's actions
             self.rounds.append(round)
 
-        # Append the final winner and return
-        if len(self.winners) < self.required_winners:
-            self.remaining_candidates = remaining_candidates
-            self.winners |= self.remaining_candidates
-
     def as_dict(self):
         data = super(STV, self).as_dict()
         data["quota"] = self.quota
@@ -15,7 +15,6 @@
 
 import random
 import types
-from copy import copy
 
 # This class provides tie breaking methods
 
@@ -25,39 +24,52 @@ class TieBreaker(object):
     #
     def __init__(self, candidate_range):
         self.ties_broken = False
-        self.random_ordering = list(candidate_range)
+        random_ordering = list(candidate_range)
         if type(candidate_range) != types.ListType:
-            random.shuffle(self.random_ordering)
+            random.shuffle(random_ordering)
+        self.random_ordering = random_ordering
+
+    # The position of every candidate in the ordering, and in the reversed
+    # ordering, is indexed whenever the ordering is set, so ties are broken
+    # by comparing positions instead of scanning the ordering.
+    @property
+    def random_ordering(self):
+        return self._random_ordering
+
+    @random_ordering.setter
+    def random_ordering(self, random_ordering):
+        self._random_ordering = random_ordering
+        last = len(random_ordering) - 1
+        self.positions = {}
+        self.reverse_positions = {}
+        for i, candidate in enumerate(random_ordering):
+            self.positions.setdefault(candidate, i)
+            self.reverse_positions[candidate] = last - i
 
     #
     def break_ties(self, tied_candidates, reverse=False):
         self.ties_broken = True
-        random_ordering = copy(self.random_ordering)
-        if reverse:
-            random_ordering.reverse()
-        if getattr(list(tied_candidates)[0], '__iter__', False):
-            result = self.break_complex_ties(tied_candidates, random_ordering)
+        positions = self.reverse_positions if reverse else self.positions
+        if getattr(next(iter(tied_candidates)), '__iter__', False):
+            result = self.break_complex_ties(tied_candidates, positions)
         else:
-            result = self.break_simple_ties(tied_candidates, random_ordering)
+            result = self.break_simple_ties(tied_candidates, positions)
         return result
 
     #
     @staticmethod
-    def break_simple_ties(tied_candidates, random_ordering):
-        for candidate in random_ordering:
-            if candidate in tied_candidates:
-                return candidate
+    def break_simple_ties(tied_candidates, positions):
+        ranked = [candidate for candidate in tied_candidates if candidate in positions]
+        if ranked:
+            return min(ranked, key=positions.__getitem__)
 
-    #
+    # Tied tuples are compared column by column, on the positions of their
+    # candidates
     @staticmethod
-    def break_complex_ties(tied_candidates, random_ordering):
-        max_columns = len(list(tied_candidates)[0])
-        column = 0
-        while len(tied_candidates) > 1 and column < max_columns:
-            min_index = min(random_ordering.index(list(candidate)[column]) for candidate in tied_candidates)
-            tied_candidates = set([candidate for candidate in tied_candidates if candidate[column] == random_ordering[min_index]])
-            column += 1
-        return list(tied_candidates)[0]
+    def break_complex_ties(tied_candidates, positions):
+        if len(tied_candidates) == 1:
+            return next(iter(tied_candidates))
+        return min(tied_candidates, key=lambda candidate: [positions[c] for c in candidate])
 
     #
     def as_list(self):
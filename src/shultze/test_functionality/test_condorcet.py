@@ -13,6 +13,7 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+from shultze.pyvotecore.condorcet import CondorcetHelper, numpy
 from shultze.pyvotecore.schulze_method import SchulzeMethod
 import unittest
 
@@ -112,5 +113,24 @@ class TestCondorcet(unittest.TestCase):
             "winner": 'Andrea'
         })
 
+class TestPairwiseEngines(unittest.TestCase):
+
+    @unittest.skipIf(numpy is None, "NumPy is not installed")
+    def test_engines_agree(self):
+
+        # Generate data
+        input = [
+            {"count":12, "ballot":{"Andrea":3, "Brad":2, "Carter":1}},
+            {"count":26, "ballot":{"Andrea":3, "Carter":2, "Brad":1}},
+            {"count":13, "ballot":{"Carter":3, "Andrea":2, "Brad":2}},
+            {"count":27, "ballot":{"Brad":3, "Andrea":-1, "Carter":-1}},
+        ]
+        candidates = set(["Andrea", "Brad", "Carter"])
+
+        # Run tests
+        self.assertEqual(
+            CondorcetHelper.pairwise_preferences(candidates, input),
+            CondorcetHelper.pairwise_preferences_numpy(candidates, input))
+
 if __name__ == "__main__":
     unittest.main()
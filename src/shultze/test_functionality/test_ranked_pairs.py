@@ -14,6 +14,8 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 from shultze.pyvotecore.ranked_pairs import RankedPairs
+from copy import deepcopy
+import random
 import unittest
 
 
@@ -116,5 +118,33 @@ class TestRankedPairs(unittest.TestCase):
             set([('chocolate', 'vanilla'), ('strawberry', 'chocolate')])
         )
 
+
+class TestRankedPairsReachability(unittest.TestCase):
+
+    def assertSameResults(self, input, tie_breaker, ballot_notation=None):
+        cycle_check = RankedPairs(deepcopy(input), tie_breaker=tie_breaker, ballot_notation=ballot_notation, engine="cycle_check").as_dict()
+        reachability = RankedPairs(deepcopy(input), tie_breaker=tie_breaker, ballot_notation=ballot_notation).as_dict()
+        self.assertEqual(cycle_check, reachability)
+
+    def test_random_ballots(self):
+        generator = random.Random(7)
+        candidates = list("ABCDEFGH")
+        for i in range(50):
+            input = [
+                {"count": generator.randint(1, 5), "ballot": dict(
+                    (candidate, generator.randint(0, 4)) for candidate in candidates
+                )}
+                for j in range(generator.randint(1, 12))
+            ]
+            self.assertSameResults(input, candidates, ballot_notation="ranking")
+
+    def test_unknown_engine(self):
+        input = [
+            {"count":1, "ballot":[["A"], ["B"], ["C"]]},
+            {"count":1, "ballot":[["B"], ["C"], ["A"]]},
+            {"count":1, "ballot":[["C"], ["A"], ["B"]]},
+        ]
+        self.assertRaises(Exception, RankedPairs, input, ballot_notation="grouping", engine="unknown")
+
 if __name__ == "__main__":
     unittest.main()
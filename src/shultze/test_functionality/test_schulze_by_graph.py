@@ -14,6 +14,8 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 from shultze.pyvotecore.schulze_by_graph import SchulzeMethodByGraph, SchulzeNPRByGraph
+import itertools
+import random
 import unittest
 
 
@@ -99,5 +101,21 @@ class TestSchulzeNPRByGraph(unittest.TestCase):
             'order': ['a', 'd', 'b'],
         })
 
+    def test_single_pass(self):
+
+        # Generate data
+        generator = random.Random(5)
+        for i in range(30):
+            edges = dict(
+                (pair, generator.randint(0, 6))
+                for pair in itertools.permutations(range(7), 2)
+            )
+            by_rounds = SchulzeNPRByGraph(dict(edges), tie_breaker=range(7), ordering="rounds", engine="heuristic").as_dict()
+            single_pass = SchulzeNPRByGraph(dict(edges), tie_breaker=range(7)).as_dict()
+
+            # Run tests
+            self.assertEqual(by_rounds, single_pass)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -14,6 +14,8 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 from shultze.pyvotecore.schulze_method import SchulzeMethod
+from copy import deepcopy
+import random
 import unittest
 
 
@@ -154,5 +156,61 @@ class TestSchulzeMethod(unittest.TestCase):
         })
         self.assertEqual(output['tied_winners'], set(['A', 'B']))
 
+
+class TestSchulzeMethodWidestPath(unittest.TestCase):
+
+    def assertSameResults(self, input, tie_breaker, ballot_notation=None):
+        heuristic = SchulzeMethod(deepcopy(input), tie_breaker=tie_breaker, ballot_notation=ballot_notation).as_dict()
+        widest_path = SchulzeMethod(deepcopy(input), tie_breaker=tie_breaker, ballot_notation=ballot_notation, engine="widest_path").as_dict()
+        heuristic.pop('actions', None)
+        self.assertEqual(heuristic, widest_path)
+
+    def test_wiki_examples(self):
+        self.assertSameResults([
+            {"count":3, "ballot":[["A"], ["C"], ["D"], ["B"]]},
+            {"count":9, "ballot":[["B"], ["A"], ["C"], ["D"]]},
+            {"count":8, "ballot":[["C"], ["D"], ["A"], ["B"]]},
+            {"count":5, "ballot":[["D"], ["A"], ["B"], ["C"]]},
+            {"count":5, "ballot":[["D"], ["B"], ["C"], ["A"]]}
+        ], ["A", "B", "C", "D"], ballot_notation="grouping")
+        self.assertSameResults([
+            {"count":5, "ballot":[["A"], ["C"], ["B"], ["E"], ["D"]]},
+            {"count":5, "ballot":[["A"], ["D"], ["E"], ["C"], ["B"]]},
+            {"count":8, "ballot":[["B"], ["E"], ["D"], ["A"], ["C"]]},
+            {"count":3, "ballot":[["C"], ["A"], ["B"], ["E"], ["D"]]},
+            {"count":7, "ballot":[["C"], ["A"], ["E"], ["B"], ["D"]]},
+            {"count":2, "ballot":[["C"], ["B"], ["A"], ["D"], ["E"]]},
+            {"count":7, "ballot":[["D"], ["C"], ["E"], ["B"], ["A"]]},
+            {"count":8, "ballot":[["E"], ["B"], ["A"], ["D"], ["C"]]}
+        ], ["A", "B", "C", "D", "E"], ballot_notation="grouping")
+
+    def test_tied_winners(self):
+        input = [
+            {"count":1, "ballot":[["A"], ["B", "C"]]},
+            {"count":1, "ballot":[["B"], ["A"], ["C"]]},
+        ]
+        output = SchulzeMethod(input, ballot_notation="grouping", engine="widest_path").as_dict()
+        self.assertEqual(output['tied_winners'], set(['A', 'B']))
+
+    def test_random_ballots(self):
+        generator = random.Random(42)
+        candidates = list("ABCDEFGH")
+        for i in range(50):
+            input = [
+                {"count": generator.randint(1, 5), "ballot": dict(
+                    (candidate, generator.randint(0, 4)) for candidate in candidates
+                )}
+                for j in range(generator.randint(1, 12))
+            ]
+            self.assertSameResults(input, candidates, ballot_notation="ranking")
+
+    def test_unknown_engine(self):
+        input = [
+            {"count":1, "ballot":[["A"], ["B"], ["C"]]},
+            {"count":1, "ballot":[["B"], ["C"], ["A"]]},
+            {"count":1, "ballot":[["C"], ["A"], ["B"]]},
+        ]
+        self.assertRaises(Exception, SchulzeMethod, input, ballot_notation="grouping", engine="unknown")
+
 if __name__ == "__main__":
     unittest.main()
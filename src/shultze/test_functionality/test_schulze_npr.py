@@ -14,6 +14,8 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 from shultze.pyvotecore.schulze_npr import SchulzeNPR
+from copy import deepcopy
+import random
 import unittest
 
 
@@ -63,5 +65,48 @@ class TestSchulzeNPR(unittest.TestCase):
         })
 
 
+    def test_widest_path_engine(self):
+
+        # Generate data
+        generator = random.Random(7)
+        candidates = list("ABCDEFG")
+        for i in range(20):
+            input = [
+                {"count": generator.randint(1, 5), "ballot": dict(
+                    (candidate, generator.randint(0, 4)) for candidate in candidates
+                )}
+                for j in range(generator.randint(1, 10))
+            ]
+            heuristic = SchulzeNPR(deepcopy(input), tie_breaker=candidates, ballot_notation="ranking", ordering="rounds", engine="heuristic").as_dict()
+            widest_path = SchulzeNPR(deepcopy(input), tie_breaker=candidates, ballot_notation="ranking", ordering="rounds", engine="widest_path").as_dict()
+
+            # Run tests
+            self.assertEqual(heuristic['order'], widest_path['order'])
+            self.assertEqual(heuristic['rounds'], widest_path['rounds'])
+
+    def test_single_tally(self):
+
+        # Generate data
+        generator = random.Random(3)
+        candidates = list("ABCDEFGH")
+        for i in range(30):
+            input = [
+                {"count": generator.randint(1, 5), "ballot": dict(
+                    (candidate, generator.randint(0, 4)) for candidate in candidates
+                )}
+                for j in range(generator.randint(1, 10))
+            ]
+            winner_threshold = generator.choice([None, 3])
+            by_rounds = SchulzeNPR(deepcopy(input), winner_threshold=winner_threshold, tie_breaker=candidates, ballot_notation="ranking", ordering="rounds", engine="heuristic").as_dict()
+            single_tally = SchulzeNPR(deepcopy(input), winner_threshold=winner_threshold, tie_breaker=candidates, ballot_notation="ranking").as_dict()
+
+            # Run tests
+            self.assertEqual(by_rounds, single_tally)
+
+    def test_unknown_ordering(self):
+        input = [{"count": 1, "ballot": {"A": 1, "B": 2}}]
+        self.assertRaises(Exception, SchulzeNPR, input, ballot_notation="ranking", ordering="unknown")
+
+
 if __name__ == "__main__":
     unittest.main()
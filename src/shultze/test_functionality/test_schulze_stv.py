@@ -13,7 +13,10 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+from shultze.pyvotecore.condorcet import numpy
 from shultze.pyvotecore.schulze_stv import SchulzeSTV
+from copy import deepcopy
+import itertools
 import unittest
 
 
@@ -179,5 +182,84 @@ class TestSchulzeSTV(unittest.TestCase):
         self.assert_(set(["B1", "B2"]) & output["winners"])
         self.assert_(set(["C1", "C2"]) & output["winners"])
 
+    def test_processes(self):
+
+        # Generate data
+        input = [
+            {"count":1, "ballot":{"A":9, "B":1, "C":1, "D":9, "E":9, "F":2}},
+            {"count":1, "ballot":{"A":3, "B":2, "C":3, "D":1, "E":9, "F":9}},
+            {"count":1, "ballot":{"A":9, "B":9, "C":9, "D":9, "E":1, "F":9}},
+            {"count":2, "ballot":{"A":1, "B":4, "C":2, "D":5, "E":3, "F":6}},
+        ]
+        tie_breaker = ["A", "B", "C", "D", "E", "F"]
+        serial = SchulzeSTV(deepcopy(input), tie_breaker=tie_breaker, required_winners=3, ballot_notation="ranking")
+        parallel = SchulzeSTV(deepcopy(input), tie_breaker=tie_breaker, required_winners=3, ballot_notation="ranking", processes=3)
+
+        # Run tests
+        self.assertEqual(serial.as_dict(), parallel.as_dict())
+        self.assertEqual(serial.edge_weights(serial.graph), parallel.edge_weights(parallel.graph))
+
+    def test_strength_by_cuts(self):
+
+        # Generate data
+        input = [
+            {"count":1, "ballot":{"A":9, "B":1, "C":1, "D":9, "E":9, "F":2}},
+            {"count":1, "ballot":{"A":3, "B":2, "C":3, "D":1, "E":9, "F":9}},
+            {"count":1, "ballot":{"A":9, "B":9, "C":9, "D":9, "E":1, "F":9}},
+            {"count":2, "ballot":{"A":1, "B":4, "C":2, "D":5, "E":3, "F":6}},
+        ]
+        stv = SchulzeSTV(input, tie_breaker=["A", "B", "C", "D", "E", "F"], required_winners=3, ballot_notation="ranking")
+
+        # Run tests
+        for candidate_set in itertools.combinations(sorted(stv.candidates), 4):
+            for candidate in candidate_set:
+                other_candidates = sorted(set(candidate_set) - set([candidate]))
+                completed = stv.proportional_completion(candidate, other_candidates)
+                self.assertAlmostEqual(
+                    stv.strength_of_vote_management_by_graph(completed),
+                    stv.strength_of_vote_management_by_cuts(completed))
+
+    @unittest.skipIf(numpy is None, "NumPy is not installed")
+    def test_proportional_completion_by_array(self):
+
+        # Generate data, with plenty of indifference
+        input = [
+            {"count":3, "ballot":{"A":1, "B":1, "C":2, "D":2, "E":1, "F":3}},
+            {"count":1, "ballot":{"A":2, "B":1, "C":1, "D":3, "E":3, "F":3}},
+            {"count":2, "ballot":{"A":1, "B":2, "C":3, "D":1, "E":2, "F":3}},
+            {"count":1, "ballot":{"A":3, "B":3, "C":3, "D":3, "E":3, "F":1}},
+            {"count":4, "ballot":{"A":1, "B":1, "C":1, "D":2, "E":2, "F":2}},
+        ]
+        stv = SchulzeSTV(input, tie_breaker=["A", "B", "C", "D", "E", "F"], required_winners=3, ballot_notation="ranking")
+
+        # Run tests
+        for candidate_set in itertools.combinations(sorted(stv.candidates), 4):
+            for candidate in candidate_set:
+                other_candidates = sorted(set(candidate_set) - set([candidate]))
+                by_array = stv.proportional_completion_by_array(candidate, other_candidates)
+                by_dict = stv.proportional_completion_by_dict(candidate, other_candidates)
+                self.assertEqual(sorted(by_dict), sorted(by_array))
+                for pattern in by_dict:
+                    self.assertAlmostEqual(by_dict[pattern], by_array[pattern])
+
+    # A completion that loses weight must fail, whichever way it is computed
+    def test_broken_completion_raises(self):
+
+        # Generate data
+        input = [
+            {"count":3, "ballot":{"A":1, "B":1, "C":2, "D":2}},
+            {"count":1, "ballot":{"A":2, "B":1, "C":1, "D":3}},
+            {"count":2, "ballot":{"A":1, "B":2, "C":3, "D":1}},
+        ]
+        stv = SchulzeSTV(input, tie_breaker=["A", "B", "C", "D"], required_winners=2, ballot_notation="ranking")
+        stv.proportional_completion_round = lambda pattern, profile: profile.pop(pattern)
+        stv.proportional_completion_round_by_array = lambda completion_id, profile, *args: profile.__setitem__(completion_id, 0)
+
+        # Run tests
+        self.assertRaises(Exception, stv.proportional_completion_by_dict, "A", ["B", "C", "D"])
+        if numpy is not None:
+            self.assertRaises(Exception, stv.proportional_completion_by_array, "A", ["B", "C", "D"])
+
+
 if __name__ == "__main__":
     unittest.main()
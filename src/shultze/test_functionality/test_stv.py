@@ -14,6 +14,8 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 from shultze.pyvotecore.stv import STV
+from copy import deepcopy
+import random
 import unittest
 
 
@@ -132,5 +134,57 @@ class TestSTV(unittest.TestCase):
             'winners': set(['c1', 'c2', 'c3'])
         })
 
+
+class TestSTVBuckets(unittest.TestCase):
+
+    # Without surplus transfers, every tally is a sum of whole ballots
+    def test_random_ballots(self):
+        generator = random.Random(11)
+        candidates = ["c1", "c2", "c3", "c4", "c5", "c6"]
+        for i in range(100):
+            input = []
+            for j in range(generator.randint(1, 40)):
+                ballot = generator.sample(candidates, len(candidates))
+                input.append({"count": generator.randint(1, 4), "ballot": ballot})
+            ballots = STV(deepcopy(input), tie_breaker=candidates, engine="ballots").as_dict()
+            buckets = STV(deepcopy(input), tie_breaker=candidates).as_dict()
+            self.assertEqual(ballots, buckets)
+
+    # Surpluses are transferred exactly, where rounding used to break the tie
+    def test_exact_surplus(self):
+
+        # Generate data
+        input = [
+            {"count":1, "ballot":["c4", "c3", "c2", "c5", "c1", "c6"]},
+            {"count":3, "ballot":["c3", "c2", "c1", "c4", "c5", "c6"]},
+            {"count":1, "ballot":["c2", "c6", "c1", "c3", "c4", "c5"]},
+            {"count":4, "ballot":["c4", "c2", "c3", "c5", "c6", "c1"]},
+            {"count":2, "ballot":["c2", "c5", "c1", "c6", "c3", "c4"]},
+            {"count":3, "ballot":["c3", "c1", "c4", "c5", "c6", "c2"]},
+            {"count":4, "ballot":["c5", "c4", "c3", "c2", "c6", "c1"]},
+            {"count":3, "ballot":["c2", "c3", "c4", "c1", "c5", "c6"]},
+            {"count":3, "ballot":["c1", "c2", "c4", "c5", "c6", "c3"]},
+            {"count":4, "ballot":["c1", "c4", "c2", "c5", "c3", "c6"]},
+            {"count":2, "ballot":["c2", "c1", "c4", "c6", "c5", "c3"]},
+            {"count":1, "ballot":["c6", "c4", "c2", "c3", "c5", "c1"]},
+            {"count":1, "ballot":["c4", "c1", "c3", "c2", "c5", "c6"]},
+            {"count":4, "ballot":["c1", "c5", "c6", "c3", "c2", "c4"]}
+        ]
+        output = STV(input, tie_breaker=["c1", "c2", "c3", "c4", "c5", "c6"], required_winners=2).as_dict()
+
+        # Run tests
+        self.assertEqual(output["rounds"][-1], {
+            'tallies': {'c2': 11.5, 'c4': 11.5},
+            'tied_losers': set(['c2', 'c4']),
+            'loser': 'c4'
+        })
+        self.assertEqual(output["winners"], set(['c1', 'c2']))
+
+    def test_unknown_engine(self):
+        input = [
+            {"count":1, "ballot":["c1", "c2", "c3", "c4"]},
+        ]
+        self.assertRaises(Exception, STV, input, engine="unknown")
+
 if __name__ == "__main__":
     unittest.main()
@@ -14,6 +14,7 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 from shultze.pyvotecore.tie_breaker import TieBreaker
+import itertools
 import unittest
 
 
@@ -47,5 +48,17 @@ class TestTieBreaker(unittest.TestCase):
             ('c', 'b')
         )
 
+    def test_ordering_reassigned(self):
+        self.tieBreaker.random_ordering = ['d', 'c', 'b', 'a']
+        self.assertEqual(self.tieBreaker.break_ties(set(['b', 'c'])), 'c')
+        self.assertEqual(self.tieBreaker.break_ties(set(['b', 'c']), reverse=True), 'b')
+
+    def test_large_tuple_tie(self):
+        candidates = [str(i) for i in range(12)]
+        tieBreaker = TieBreaker(list(reversed(candidates)))
+        tied = set(itertools.combinations(candidates, 5))
+        self.assertEqual(tieBreaker.break_ties(tied), ('7', '8', '9', '10', '11'))
+        self.assertEqual(tieBreaker.break_ties(tied, reverse=True), ('0', '1', '2', '3', '4'))
+
 if __name__ == "__main__":
     unittest.main()
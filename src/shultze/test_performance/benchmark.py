@@ -0,0 +1,279 @@
+# Copyright (C) 2009, Brad Beattie
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Benchmarks every pyvotecore method over synthetic ballots, across candidate
+and voter counts, and compares the results with a stored baseline.
+
+    python -m shultze.test_performance.benchmark [--quick] [--output FILE]
+        [--baseline FILE] [--update-baseline]
+
+Each case runs in a fresh interpreter of its own, so that its timing does not
+depend on the state of the process running the suite (a test runner, say),
+and its peak memory can be read from the child's resource usage. Exits with status 1 when a case is
+slower, or uses more memory, than its baseline allows.
+
+Timings only compare on the host that recorded them, so record a baseline
+of your own before comparing, and after changing hosts:
+
+    python -m shultze.test_performance.benchmark --update-baseline
+"""
+from shultze.pyvotecore.condorcet import CondorcetHelper
+from shultze.pyvotecore.irv import IRV
+from shultze.pyvotecore.plurality import Plurality
+from shultze.pyvotecore.ranked_pairs import RankedPairs
+from shultze.pyvotecore.schulze_method import SchulzeMethod
+from shultze.pyvotecore.schulze_npr import SchulzeNPR
+from shultze.pyvotecore.schulze_pr import SchulzePR
+from shultze.pyvotecore.schulze_stv import SchulzeSTV
+from shultze.pyvotecore.stv import STV
+import argparse
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import time
+
+BASELINE = os.path.join(os.path.dirname(__file__), "benchmark_baseline.json")
+
+# The directory the shultze package is imported from
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DISTRIBUTIONS = ("uniform", "clustered", "ties")
+
+# A case regresses when it takes more than TIME_TOLERANCE times its baseline
+# time. Baselines under TIME_FLOOR seconds are compared as if they took
+# TIME_FLOOR, so that the noise of the shortest cases does not fail them.
+# Memory is given the same treatment, in kilobytes.
+TIME_TOLERANCE = 3.0
+TIME_FLOOR = 0.01
+MEMORY_TOLERANCE = 2.0
+MEMORY_FLOOR = 1024
+
+
+# Each voter ranks every candidate, lower ranks being preferred.
+#   uniform: strict random orders
+#   clustered: orders close to one of three factions' orders
+#   ties: random ranks out of three, so most candidates are tied
+def generate_voters(distribution, candidates, voters, seed=0):
+    generator = random.Random(seed)
+    names = ["c%d" % i for i in xrange(candidates)]
+    if distribution == "uniform":
+        result = []
+        for i in xrange(voters):
+            order = list(names)
+            generator.shuffle(order)
+            result.append(dict((c, rank) for rank, c in enumerate(order)))
+        return result
+    elif distribution == "clustered":
+        factions = []
+        for i in xrange(3):
+            order = list(names)
+            generator.shuffle(order)
+            factions.append(order)
+        result = []
+        for i in xrange(voters):
+            order = list(generator.choice(factions))
+            for j in xrange(2):
+                k = generator.randrange(candidates - 1)
+                order[k], order[k + 1] = order[k + 1], order[k]
+            result.append(dict((c, rank) for rank, c in enumerate(order)))
+        return result
+    elif distribution == "ties":
+        return [dict((c, generator.randint(0, 2)) for c in names)
+                for i in xrange(voters)]
+    else:
+        raise Exception("Unknown distribution specified")
+
+
+def ranking_ballots(voters):
+    return [{"count": 1, "ballot": dict(voter)} for voter in voters]
+
+
+def ordered_ballots(voters):
+    return [{"count": 1, "ballot": sorted(voter, key=lambda c: (voter[c], c))}
+            for voter in voters]
+
+
+def plurality_ballots(voters):
+    return [{"count": 1, "ballot": min(voter, key=lambda c: (voter[c], c))}
+            for voter in voters]
+
+
+# method: (ballot format, how to count them, candidate counts, voter counts,
+#          the candidate and voter counts of the quick suite)
+# The quick suite runs one of the larger sizes of every method, so that its
+# cases stay well above the floors and the whole suite still takes seconds.
+METHODS = {
+    "plurality": (
+        plurality_ballots,
+        lambda ballots, names: Plurality(ballots, tie_breaker=names),
+        (5, 20, 100), (1000, 10000, 100000), (5, 100000)),
+    "irv": (
+        ordered_ballots,
+        lambda ballots, names: IRV(ballots, tie_breaker=names),
+        (5, 20, 50), (1000, 10000), (50, 1000)),
+    "stv": (
+        ordered_ballots,
+        lambda ballots, names: STV(ballots, tie_breaker=names, required_winners=3),
+        (6, 20, 50), (1000, 10000), (20, 1000)),
+    "condorcet": (
+        ranking_ballots,
+        lambda ballots, names: CondorcetHelper.ballots_into_pairs(names, ballots),
+        (10, 40, 100), (1000, 10000), (40, 10000)),
+    "ranked_pairs": (
+        ranking_ballots,
+        lambda ballots, names: RankedPairs(ballots, tie_breaker=names, ballot_notation="ranking"),
+        (10, 40, 100), (100, 1000), (40, 1000)),
+    "schulze_method": (
+        ranking_ballots,
+        lambda ballots, names: SchulzeMethod(ballots, tie_breaker=names, ballot_notation="ranking"),
+        (10, 40, 100), (100, 1000), (100, 100)),
+    "schulze_npr": (
+        ranking_ballots,
+        lambda ballots, names: SchulzeNPR(ballots, tie_breaker=names, ballot_notation="ranking"),
+        (10, 40, 100), (100, 1000), (100, 100)),
+    "schulze_stv": (
+        ranking_ballots,
+        lambda ballots, names: SchulzeSTV(ballots, tie_breaker=names, required_winners=3, ballot_notation="ranking"),
+        (5, 7, 8), (20, 100), (7, 100)),
+    "schulze_pr": (
+        ranking_ballots,
+        lambda ballots, names: SchulzePR(ballots, tie_breaker=names, winner_threshold=3, ballot_notation="ranking"),
+        (5, 7, 8), (20, 100), (8, 100)),
+}
+
+
+def cases(quick=False):
+    for method in sorted(METHODS):
+        ballot_format, count, candidate_counts, voter_counts, quick_counts = METHODS[method]
+        if quick:
+            candidate_counts, voter_counts = (quick_counts[0],), (quick_counts[1],)
+        for distribution in DISTRIBUTIONS:
+            for candidates in candidate_counts:
+                for voters in voter_counts:
+                    yield {
+                        "method": method,
+                        "distribution": distribution,
+                        "candidates": candidates,
+                        "voters": voters,
+                    }
+
+
+def case_key(case):
+    return "%(method)s/%(distribution)s/%(candidates)d/%(voters)d" % case
+
+
+def measure(case):
+    ballot_format, count, candidate_counts, voter_counts, quick_counts = METHODS[case["method"]]
+    voters = generate_voters(case["distribution"], case["candidates"], case["voters"])
+    ballots = ballot_format(voters)
+    names = sorted(voters[0])
+    memory = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    startTime = time.time()
+    count(ballots, names)
+    seconds = time.time() - startTime
+    memory = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - memory
+    return {"seconds": round(seconds, 4), "peak_memory_kb": memory}
+
+
+# Runs the case in a child interpreter, and returns it with its wall time
+# and the growth of the child's peak resident memory, in kilobytes.
+def run_case(case):
+    process = subprocess.Popen(
+        [sys.executable, "-m", "shultze.test_performance.benchmark", "--case", json.dumps(case)],
+        cwd=ROOT, stdout=subprocess.PIPE)
+    output = process.communicate()[0]
+    if process.returncode != 0:
+        raise Exception("Benchmark %s failed" % case_key(case))
+    result = json.loads(output.splitlines()[-1])
+    result.update(case)
+    return result
+
+
+def run(quick=False, stream=None):
+    results = []
+    for case in cases(quick):
+        result = run_case(case)
+        if stream is not None:
+            stream.write("%-40s %8.3fs %8dkB\n" % (
+                case_key(result), result["seconds"], result["peak_memory_kb"]))
+        results.append(result)
+    return results
+
+
+# Returns a message per case that regressed from its baseline. Cases that
+# are missing from the baseline are not compared.
+def compare(results, baseline):
+    baseline = dict((case_key(result), result) for result in baseline)
+    regressions = []
+    for result in results:
+        key = case_key(result)
+        if key not in baseline:
+            continue
+        expected = baseline[key]
+        if result["seconds"] > max(expected["seconds"], TIME_FLOOR) * TIME_TOLERANCE:
+            regressions.append("%s took %.3fs, the baseline took %.3fs" % (
+                key, result["seconds"], expected["seconds"]))
+        if result["peak_memory_kb"] > max(expected["peak_memory_kb"], MEMORY_FLOOR) * MEMORY_TOLERANCE:
+            regressions.append("%s used %dkB, the baseline used %dkB" % (
+                key, result["peak_memory_kb"], expected["peak_memory_kb"]))
+    return regressions
+
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)["results"]
+
+
+def dump(results, path):
+    with open(path, "w") as f:
+        json.dump({"results": results}, f, indent=2, sort_keys=True,
+                  separators=(",", ": "))
+        f.write("\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the pyvotecore methods.")
+    parser.add_argument("--quick", action="store_true",
+                        help="only run one size of every method")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", default=BASELINE,
+                        help="compare the results with this JSON file")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="write the results to the baseline instead")
+    parser.add_argument("--case", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.case:
+        print json.dumps(measure(json.loads(args.case)))
+        return 0
+
+    results = run(args.quick, sys.stdout)
+    if args.output:
+        dump(results, args.output)
+    if args.update_baseline:
+        dump(results, args.baseline)
+        return 0
+
+    regressions = compare(results, load(args.baseline))
+    for regression in regressions:
+        sys.stderr.write("REGRESSION: %s\n" % regression)
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
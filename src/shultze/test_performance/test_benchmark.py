@@ -0,0 +1,45 @@
+# Copyright (C) 2009, Brad Beattie
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from shultze.test_performance import benchmark
+import os
+import unittest
+
+
+class TestBenchmark(unittest.TestCase):
+
+    def test_compare(self):
+        case = {"method": "stv", "distribution": "uniform", "candidates": 6, "voters": 1000}
+        baseline = [dict(case, seconds=1.0, peak_memory_kb=1024)]
+
+        self.assertEqual([], benchmark.compare([dict(case, seconds=3.0, peak_memory_kb=1024)], baseline))
+        self.assertEqual(1, len(benchmark.compare([dict(case, seconds=3.2, peak_memory_kb=1024)], baseline)))
+        self.assertEqual(1, len(benchmark.compare([dict(case, seconds=1.0, peak_memory_kb=20000)], baseline)))
+        self.assertEqual(1, len(benchmark.compare([dict(case, seconds=0.05, peak_memory_kb=0)], [dict(case, seconds=0.001, peak_memory_kb=0)])))
+        self.assertEqual(1, len(benchmark.compare([dict(case, seconds=0.0, peak_memory_kb=4096)], [dict(case, seconds=0.0, peak_memory_kb=0)])))
+        self.assertEqual([], benchmark.compare([dict(case, voters=10000, seconds=60.0, peak_memory_kb=0)], baseline))
+
+    # Runs the quick suite, and fails on any regression from the stored
+    # baseline. Timings only compare on the host that recorded them, so this
+    # only runs when PYVOTECORE_BENCHMARK is set, after recording a baseline
+    # with --update-baseline.
+    @unittest.skipUnless(os.environ.get("PYVOTECORE_BENCHMARK"), "PYVOTECORE_BENCHMARK is not set")
+    def test_quick_suite(self):
+        results = benchmark.run(quick=True)
+        regressions = benchmark.compare(results, benchmark.load(benchmark.BASELINE))
+        self.assertEqual([], regressions, "\n".join(regressions))
+
+if __name__ == "__main__":
+    unittest.main()
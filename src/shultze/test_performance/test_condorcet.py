@@ -0,0 +1,40 @@
+from shultze.pyvotecore.condorcet import CondorcetHelper, numpy
+import random
+import time
+import unittest
+
+
+class TestPairwisePreferences(unittest.TestCase):
+
+    # Tallies pairwise preferences for 100 candidates and 10k ballots with
+    # the NumPy engine. The pure Python engine is timed on a slice of the
+    # ballots, as it grows linearly with their number.
+    @unittest.skipIf(numpy is None, "NumPy is not installed")
+    def test_100_candidates_10000_ballots(self):
+
+        # Generate data
+        rand = random.Random(100)
+        candidates = range(100)
+        ballots = [
+            {"count": rand.randint(1, 3),
+             "ballot": dict((c, float(rand.randint(0, 20))) for c in candidates)}
+            for i in xrange(10000)
+        ]
+        sample = ballots[:500]
+
+        startTime = time.time()
+        expected = CondorcetHelper.pairwise_preferences(candidates, sample)
+        python_time = (time.time() - startTime) * len(ballots) / len(sample)
+
+        startTime = time.time()
+        CondorcetHelper.pairwise_preferences_numpy(candidates, ballots)
+        numpy_time = time.time() - startTime
+
+        # Run tests
+        self.assertEqual(expected, CondorcetHelper.pairwise_preferences_numpy(
+            candidates, sample))
+        self.assert_(numpy_time < 5)
+        self.assert_(numpy_time * 5 < python_time)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+# Copyright (C) 2009, Brad Beattie
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from shultze.pyvotecore.ranked_pairs import RankedPairs
+import random
+import time
+import unittest
+
+
+class TestRankedPairs(unittest.TestCase):
+
+    # Locks the pairs of 100 candidates, most of them tied in cycles
+    def test_100_candidates(self):
+
+        # Generate data
+        generator = random.Random(3)
+        candidates = range(100)
+        input = [
+            {"count": generator.randint(1, 3), "ballot": dict(
+                (candidate, generator.randint(0, 20)) for candidate in candidates
+            )}
+            for i in xrange(200)
+        ]
+        startTime = time.time()
+        output = RankedPairs(input, tie_breaker=candidates, ballot_notation="ranking").as_dict()
+
+        # Run tests
+        self.assert_(time.time() - startTime < 5)
+        self.assertEqual(len(output["strong_pairs"]), len(output["rounds"]))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+# Copyright (C) 2009, Brad Beattie
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from shultze.pyvotecore.schulze_by_graph import SchulzeNPRByGraph
+import itertools
+import random
+import time
+import unittest
+
+
+class TestSchulzeWidestPath(unittest.TestCase):
+
+    # Ranks 40 issues, each round being a full Condorcet completion over
+    # a preference cycle, which the Schwartz set heuristic chokes on.
+    def test_40_candidates_widest_path(self):
+
+        # Generate data
+        generator = random.Random(1)
+        edges = dict(
+            (pair, generator.randint(0, 100))
+            for pair in itertools.permutations(range(40), 2)
+        )
+        startTime = time.time()
+        SchulzeNPRByGraph(edges, ordering="rounds", engine="widest_path").as_dict()
+
+        # Run tests
+        self.assert_(time.time() - startTime < 5)
+
+
+    # Orders 150 issues, with a preference cycle to complete in every round
+    def test_150_candidates_ordering(self):
+
+        # Generate data
+        generator = random.Random(2)
+        edges = dict(
+            (pair, generator.randint(0, 100))
+            for pair in itertools.permutations(range(150), 2)
+        )
+        startTime = time.time()
+        output = SchulzeNPRByGraph(edges).as_dict()
+
+        # Run tests
+        self.assert_(time.time() - startTime < 10)
+        self.assertEqual(150, len(output['order']))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+# Copyright (C) 2009, Brad Beattie
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from shultze.pyvotecore.stv import STV
+import itertools
+import random
+import time
+import unittest
+
+
+class TestSTV(unittest.TestCase):
+
+    # Counts a referendum of 100k voters choosing 3 of 6 candidates, which
+    # only rank them in a few hundred different ways
+    def test_100000_voters_6_candidates(self):
+
+        # Generate data
+        generator = random.Random(5)
+        orders = list(itertools.permutations(["c1", "c2", "c3", "c4", "c5", "c6"]))
+        input = [
+            {"count": 1, "ballot": list(generator.choice(orders))}
+            for i in xrange(100000)
+        ]
+        startTime = time.time()
+        output = STV(input, required_winners=3).as_dict()
+
+        # Run tests
+        self.assert_(time.time() - startTime < 5)
+        self.assertEqual(len(output["winners"]), 3)
+
+if __name__ == "__main__":
+    unittest.main()
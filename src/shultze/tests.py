@@ -9,8 +9,9 @@ from django.test import TestCase
 from communities.models import Community
 from users.models import OCUser
 from issues.models import Issue
-from issues.shultze_vote import user_vote
-from shultze.models import IssuesGraph, IssueEdge
+from issues.shultze_vote import user_vote, set_issues_order_by_votes
+from shultze.matrix import PairwiseMatrix
+from shultze.models import IssuesGraph, IssueNode, IssueEdge
 
 class GraphToResults(TestCase):
     def setUp(self):
@@ -36,24 +37,14 @@ class GraphToResults(TestCase):
         graph.add_node(issue_c)
 
         #update weights on graph's edges
-        edge = IssueEdge.objects.get(graph=graph, from_node=issue_a, to_node=issue_b)
-        edge.weight = 8
-        edge.save()
-        edge = IssueEdge.objects.get(graph=graph, from_node=issue_b, to_node=issue_a)
-        edge.weight = 3
-        edge.save()
-        edge = IssueEdge.objects.get(graph=graph, from_node=issue_a, to_node=issue_c)
-        edge.weight = 3
-        edge.save()
-        edge = IssueEdge.objects.get(graph=graph, from_node=issue_c, to_node=issue_a)
-        edge.weight = 4
-        edge.save()
-        edge = IssueEdge.objects.get(graph=graph, from_node=issue_b, to_node=issue_c)
-        edge.weight = 6
-        edge.save()
-        edge = IssueEdge.objects.get(graph=graph, from_node=issue_c, to_node=issue_b)
-        edge.weight = 3
-        edge.save()
+        matrix = graph.get_matrix()
+        matrix.set_weight(issue_a.id, issue_b.id, 8)
+        matrix.set_weight(issue_b.id, issue_a.id, 3)
+        matrix.set_weight(issue_a.id, issue_c.id, 3)
+        matrix.set_weight(issue_c.id, issue_a.id, 4)
+        matrix.set_weight(issue_b.id, issue_c.id, 6)
+        matrix.set_weight(issue_c.id, issue_b.id, 3)
+        graph.save_matrix()
         
         #calculate results
         output = graph.get_schulze_npr_results()
@@ -427,4 +418,133 @@ class RatedOrders(TestCase):
             [{1: 1},
              {2: 1},
              {3: 0}]
-        )
\ No newline at end of file
+        )
+
+class PairwiseMatrixTest(TestCase):
+    ballots = [
+        {'ballot': [[1], [2], [3], [4], [5]], 'count': 3},
+        {'ballot': [[5], [2], [3], [4], [1]], 'count': 9},
+        {'ballot': [[5], [1], [3], [4], [1]], 'count': 8},
+        {'ballot': [[3], [2, 4], [1]], 'count': 5},
+        {'ballot': [[1], [2]], 'count': 5},
+    ]
+
+    def test_same_pairs_as_pyvotecore(self):
+        """Check the matrix counts preferences like CondorcetHelper"""
+        from copy import deepcopy
+        from shultze.models import PyVoteCoreAssistance
+        assistance = PyVoteCoreAssistance()
+        assistance.add_ballot(deepcopy(self.ballots), ballot_notation="grouping")
+
+        matrix = PairwiseMatrix([1, 2, 3, 4, 5])
+        matrix.add_ballots(self.ballots)
+
+        self.assertEqual(matrix.as_edges_dict(), assistance.pairs)
+
+    def test_reverse_and_growth(self):
+        """Check deducting ballots and adding candidates keep the weights"""
+        matrix = PairwiseMatrix([1, 2, 3, 4, 5])
+        matrix.add_ballots(self.ballots)
+        expected = matrix.as_edges_dict()
+
+        matrix.add_candidates([7, 6])
+        matrix.add_ballots([{'ballot': [[6], [1]], 'count': 2}])
+        matrix.add_ballots([{'ballot': [[6], [1]], 'count': 2}], reverse=True)
+
+        edges = matrix.as_edges_dict()
+        self.assertEqual(0, edges[(6, 1)])
+        self.assertEqual(0, edges[(7, 6)])
+        for edge, weight in expected.items():
+            self.assertEqual(weight, edges[edge])
+
+    def test_serialization(self):
+        matrix = PairwiseMatrix([3, 1, 2])
+        matrix.add_ballots([{'ballot': [[2], [3, 1]], 'count': 2}])
+        loaded = PairwiseMatrix.deserialize(*matrix.serialize())
+        self.assertEqual([3, 1, 2], loaded.candidates)
+        self.assertEqual(matrix.as_edges_dict(), loaded.as_edges_dict())
+
+
+class StoredMatrix(TestCase):
+    def setUp(self):
+        self.com = Community.objects.create(name='com1')
+        self.usr = OCUser.objects.create_user('a@b.com')
+        self.graph = IssuesGraph.objects.create(community=self.com)
+        self.issues = [Issue.objects.create(community=self.com,
+                                            created_by=self.usr,
+                                            title='issue_%d' % i)
+                       for i in range(20)]
+
+    def test_add_ballots_query_count(self):
+        """Check a ballot is added in a fixed number of queries"""
+        self.graph.initialize_graph()
+        ballot = [{'count': 1, 'ballot': [[i.id] for i in self.issues]}]
+
+        # load and lock, update the matrix
+        with self.assertNumQueries(2):
+            self.graph.add_ballots(ballot)
+
+        edges = IssuesGraph.objects.get(id=self.graph.id).get_edges_dict()
+        self.assertEqual(380, len(edges))
+        self.assertEqual(1, edges[(self.issues[0].id, self.issues[1].id)])
+        self.assertEqual(0, edges[(self.issues[1].id, self.issues[0].id)])
+
+    def test_legacy_edges_converted(self):
+        """Check graphs stored as IssueEdge rows keep their weights"""
+        a, b = self.issues[:2]
+        node_a = IssueNode.objects.create(graph=self.graph, issue=a)
+        node_b = IssueNode.objects.create(graph=self.graph, issue=b)
+        IssueEdge.objects.create(graph=self.graph, from_node=node_a,
+                                 to_node=node_b, weight=4)
+        IssueEdge.objects.create(graph=self.graph, from_node=node_b,
+                                 to_node=node_a, weight=1)
+
+        self.graph.add_ballots([{'count': 1, 'ballot': [[b.id], [a.id]]}])
+
+        self.assertEqual({(a.id, b.id): 4, (b.id, a.id): 2},
+                         self.graph.get_edges_dict())
+
+
+class IncrementalRanking(TestCase):
+    def setUp(self):
+        self.com = Community.objects.create(name='com1')
+        self.usr = OCUser.objects.create_user('a@b.com')
+        self.issues = [Issue.objects.create(community=self.com,
+                                            created_by=self.usr,
+                                            title='issue_%d' % i)
+                       for i in range(4)]
+        self.ids = [i.id for i in self.issues]
+
+    def order_by_votes(self):
+        return dict(Issue.objects.filter(community=self.com)
+                    .values_list('id', 'order_by_votes'))
+
+    def test_vote_change(self):
+        """Check a changed vote ranks issues as a full recalculation does"""
+        a, b, c, d = self.ids
+        first = [{'count': 1, 'ballot': [[d], [c], [b], [a]]}]
+        second = [{'count': 1, 'ballot': [[b], [a], [c], [d]]}]
+        other = [{'count': 3, 'ballot': [[a], [b], [c], [d]]}]
+
+        set_issues_order_by_votes(self.com.id, user_vote(self.com.id, other))
+        set_issues_order_by_votes(self.com.id, user_vote(self.com.id, first))
+        g = user_vote(self.com.id, second, first)
+
+        # likes of the first and last issues, previous values, single update
+        with self.assertNumQueries(3):
+            set_issues_order_by_votes(self.com.id, g)
+        incremental = self.order_by_votes()
+
+        Issue.objects.filter(community=self.com).update(order_by_votes=0)
+        set_issues_order_by_votes(self.com.id)
+        self.assertEqual(incremental, self.order_by_votes())
+
+    def test_unchanged_order_not_written(self):
+        a, b, c, d = self.ids
+        ballot = [{'count': 1, 'ballot': [[a], [b], [c], [d]]}]
+        g = user_vote(self.com.id, ballot)
+        set_issues_order_by_votes(self.com.id, g)
+
+        g = user_vote(self.com.id, ballot, ballot)
+        with self.assertNumQueries(2):
+            set_issues_order_by_votes(self.com.id, g)
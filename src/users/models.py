@@ -1,8 +1,13 @@
 from django.conf import settings
 from django.contrib.auth.models import BaseUserManager, AbstractBaseUser, \
     PermissionsMixin
+from django.core.cache import get_cache
+from django.core.cache.backends.locmem import LocMemCache
 from django.core.mail import send_mail
 from django.db import models
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from django.test.signals import setting_changed
 from django.template.loader import render_to_string
 from django.utils import timezone
 from django.utils.translation import ugettext_lazy as _
@@ -97,10 +102,7 @@ class OCUser(AbstractBaseUser, PermissionsMixin):
         return self.display_name
 
     def get_default_group(self, community):
-        try:
-            return self.memberships.get(community=community).default_group_name
-        except Membership.DoesNotExist:
-            return ""
+        return get_membership_group(self, community) or ""
 
     def email_user(self, subject, message, from_email=None):
         """
@@ -228,6 +230,69 @@ class Membership(models.Model):
         return self._user_board_votes().filter(value=ProposalVoteValue.NEUTRAL,
                                               proposal__status=ProposalStatus.ACCEPTED)
 
+def membership_cache_key(user_id, community_id):
+    return 'membership:{0}:{1}'.format(user_id, community_id)
+
+
+_membership_cache = {}
+
+
+def membership_cache():
+    """Returns the cache memberships are kept in, or None if the default
+    cache is local to the process.
+
+    Memberships are invalidated only in the process that changes them, so a
+    local-memory cache would let every other web or queue worker keep
+    stale permissions until the entries expire.
+
+    """
+    if 'cache' not in _membership_cache:
+        cache = get_cache('default')
+        _membership_cache['cache'] = None if isinstance(cache, LocMemCache) \
+            else cache
+    return _membership_cache['cache']
+
+
+@receiver(setting_changed)
+def reset_membership_cache(sender, setting, **kwargs):
+    if setting == 'CACHES':
+        _membership_cache.clear()
+
+
+def get_membership_group(user, community):
+    """Returns the default group name of user in community, or None if the
+    user is not a member.
+
+    The answer is kept in the shared cache across requests (see
+    membership_cache()), and dropped whenever a membership of the user in
+    the community is saved or deleted.
+
+    """
+    cache = membership_cache()
+    key = membership_cache_key(user.id, community.id)
+    group = cache.get(key) if cache else None
+    if group is None:
+        try:
+            group = user.memberships.get(
+                community=community).default_group_name
+        except Membership.DoesNotExist:
+            # cached as an empty string, as None stands for a cache miss.
+            group = ''
+        if cache:
+            cache.set(key, group,
+                      settings.OPENCOMMUNITY_MEMBERSHIP_CACHE_TIMEOUT)
+    return group or None
+
+
+@receiver(post_save, sender=Membership)
+@receiver(post_delete, sender=Membership)
+def invalidate_membership_cache(sender, instance, **kwargs):
+    cache = membership_cache()
+    if cache:
+        cache.delete(membership_cache_key(instance.user_id,
+                                          instance.community_id))
+
+
 CODE_CHARS = string.lowercase + string.digits
 
 
@@ -1,5 +1,5 @@
 from users.default_roles import DefaultGroups, ALL_PERMISSIONS
-from users.models import Membership
+from users.models import get_membership_group
 from collections import defaultdict
 
 
@@ -11,11 +11,9 @@ part of the OCUser model.
 
 def load_community_permissions(user, community):
     if user.is_authenticated():
-        try:
-            m = user.memberships.get(community=community)
-            return m.get_permissions()
-        except Membership.DoesNotExist:
-            pass
+        group = get_membership_group(user, community)
+        if group:
+            return DefaultGroups.permissions[group]
 
     if community.is_public:
         return DefaultGroups.permissions[DefaultGroups.MEMBER]
@@ -0,0 +1,82 @@
+import shutil
+import tempfile
+
+from django.core.cache import get_cache
+from django.test import TestCase
+from django.test.utils import override_settings
+
+from communities.tests.common import create_sample_community
+from users import models
+from users.default_roles import DefaultGroups
+from users.models import Membership, OCUser
+from users.permissions import load_community_permissions
+
+
+class MembershipCacheTest(TestCase):
+    def setUp(self):
+        # the test settings disable caching, so use a file cache of our own,
+        # which, as in production, is shared across processes.
+        self.location = tempfile.mkdtemp()
+        self.caches = {'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': self.location}}
+        self.override = override_settings(CACHES=self.caches)
+        self.override.enable()
+        (self.c, self.members, self.chairmen) = create_sample_community()
+        self.u = OCUser.objects.create_user("outsider@example.com",
+                                            "Outsider", password="password")
+
+    def tearDown(self):
+        self.override.disable()
+        shutil.rmtree(self.location)
+
+    def test_membership_cached(self):
+        with self.assertNumQueries(1):
+            for i in range(3):
+                self.assertEquals(
+                    DefaultGroups.CHAIRMAN,
+                    models.get_membership_group(self.chairmen[0], self.c))
+
+    def test_non_member_cached(self):
+        with self.assertNumQueries(1):
+            for i in range(3):
+                self.assertIsNone(models.get_membership_group(self.u, self.c))
+
+    def test_invalidated_on_membership_change(self):
+        self.assertEquals([], load_community_permissions(self.u, self.c))
+
+        m = Membership.objects.create(user=self.u, community=self.c,
+                                      default_group_name=DefaultGroups.MEMBER)
+        self.assertEquals(DefaultGroups.MEMBER,
+                          models.get_membership_group(self.u, self.c))
+
+        m.default_group_name = DefaultGroups.BOARD
+        m.save()
+        self.assertEquals(
+            DefaultGroups.permissions[DefaultGroups.BOARD],
+            load_community_permissions(self.u, self.c))
+
+        m.delete()
+        self.assertIsNone(models.get_membership_group(self.u, self.c))
+
+    def test_invalidation_seen_by_other_processes(self):
+        key = models.membership_cache_key(self.u.id, self.c.id)
+        models.get_membership_group(self.u, self.c)
+        # a cache of its own, as another worker would have
+        other = get_cache('django.core.cache.backends.filebased.FileBasedCache',
+                          LOCATION=self.location)
+        self.assertEquals('', other.get(key))
+
+        Membership.objects.create(user=self.u, community=self.c,
+                                  default_group_name=DefaultGroups.MEMBER)
+        self.assertIsNone(other.get(key))
+
+    @override_settings(CACHES={'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_local_memory_cache_not_used(self):
+        self.assertIsNone(models.membership_cache())
+        with self.assertNumQueries(3):
+            for i in range(3):
+                self.assertEquals(
+                    DefaultGroups.CHAIRMAN,
+                    models.get_membership_group(self.chairmen[0], self.c))